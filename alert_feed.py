@@ -0,0 +1,219 @@
+import json
+import os
+import threading
+from bisect import bisect_left, bisect_right
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+try:
+    import fcntl
+except ImportError:  # Windows: no cross-process lock around compacting the visits file
+    fcntl = None
+
+import numpy as np
+import pandas as pd
+
+from risk_calculator import risk_band_labels
+
+# --- Configuration for the Alert Feed ---
+ALERT_FEED_PATH = 'alert_feed.csv'
+ALERT_RETENTION_DAYS = 30
+VISITS_PATH = 'mentor_visits.jsonl'
+VISITS_COMPACT_LINES = 10_000  # the visits file is compacted once it has this many lines
+VISITS_COMPACT_FACTOR = 4  # ... and this many lines per mentor
+ALERT_LABELS = {'newly_red': 'Newly Red', 'newly_amber': 'Newly Amber', 'worsening': 'Worsening',
+                'improved': 'Improved'}
+DIFF_COLUMNS = ['student_id', 'risk_band', 'risk_score']
+FEED_COLUMNS = ['generated_at', 'ledger_version', 'student_id', 'mentor_id', 'name', 'branch', 'alert',
+                'previous_band', 'risk_band', 'previous_score', 'risk_score', 'risk_reasons']
+
+
+def timestamp(moment=None):
+    return (moment or datetime.now()).isoformat(timespec='seconds')
+
+
+def band_codes(bands, band_labels=None):
+    """
+    0 for the red band, 1 for amber, 2 for green (by position in band_labels, by default the rule
+    file's), -1 for anything else.
+    """
+    band_labels = band_labels or risk_band_labels()
+    return np.asarray(pd.Categorical(bands, categories=list(band_labels)).codes, dtype=np.int64)
+
+
+def diff_ledgers(previous, current, previous_labels=None, band_labels=None):
+    """
+    Band transitions from one scored ledger to the next, one row per student with an alert:
+    newly_red (now red, was not), newly_amber (now amber, was green or is new), improved (moved
+    to a lower-risk band) and worsening (same band, higher score). previous_labels and band_labels
+    are the labels each ledger was scored with (default: the rule file's); bands in the result are
+    named with band_labels.
+    """
+    band_labels = band_labels or risk_band_labels()
+    previous_labels = previous_labels or band_labels
+    positions = pd.Index(previous['student_id']).get_indexer(current['student_id'])
+    known = positions >= 0
+    previous_code = np.where(known, band_codes(previous['risk_band'], previous_labels)[positions], -1)
+    previous_score = np.where(known, previous['risk_score'].to_numpy(dtype=float)[positions], np.nan)
+    code = band_codes(current['risk_band'], band_labels)
+    score = current['risk_score'].to_numpy(dtype=float)
+
+    alert = np.select([
+        (code == 0) & (previous_code != 0),
+        (code == 1) & ((previous_code == 2) | ~known),
+        (previous_code >= 0) & (code > previous_code),
+        (code >= 0) & (code == previous_code) & (score > previous_score),
+    ], ['newly_red', 'newly_amber', 'improved', 'worsening'], default='')
+    rows = np.flatnonzero(alert != '')
+
+    labels = np.array(list(band_labels) + [''], dtype=object)  # code -1 picks the empty label
+    alerts = current.iloc[rows][['student_id', 'mentor_id', 'name', 'branch', 'risk_reasons']].reset_index(drop=True)
+    alerts['alert'] = alert[rows]
+    alerts['previous_band'] = labels[previous_code[rows]]
+    alerts['risk_band'] = labels[code[rows]]
+    alerts['previous_score'] = previous_score[rows]
+    alerts['risk_score'] = score[rows]
+    return alerts
+
+
+def record_alerts(alerts, ledger_version, path=ALERT_FEED_PATH, retention_days=ALERT_RETENTION_DAYS, now=None):
+    """Appends one generation of alerts to the feed and drops generations older than the retention window."""
+    now = now or datetime.now()
+    alerts = alerts.assign(generated_at=timestamp(now), ledger_version=ledger_version)[FEED_COLUMNS]
+    if os.path.exists(path):
+        feed = pd.read_csv(path, float_precision='round_trip')
+        feed = feed[feed['generated_at'] >= timestamp(now - timedelta(days=retention_days))]
+        alerts = pd.concat([feed, alerts], ignore_index=True)
+    tmp_path = f'{path}.tmp-{os.getpid()}'
+    alerts.to_csv(tmp_path, index=False)
+    os.replace(tmp_path, path)
+    return alerts
+
+
+class AlertFeed:
+    """The alert feed indexed by mentor_id in time order, so the dashboard reads a mentor's alerts directly."""
+
+    def __init__(self, feed):
+        self.latest = feed['generated_at'].max() if len(feed) else None
+        self._by_mentor = {}  # mentor_id -> (generated_at of each alert, alert records), oldest first
+        feed = feed.fillna({'previous_band': '', 'risk_reasons': ''}).sort_values('generated_at', kind='stable')
+        for record in feed.to_dict('records'):
+            times, records = self._by_mentor.setdefault(record['mentor_id'], ([], []))
+            times.append(record['generated_at'])
+            records.append(record)
+
+    @classmethod
+    def load(cls, path=ALERT_FEED_PATH):
+        if not os.path.exists(path):
+            return cls(pd.DataFrame(columns=FEED_COLUMNS))
+        return cls(pd.read_csv(path, float_precision='round_trip'))
+
+    def since(self, mentor_id, since=None):
+        """
+        The mentor's alerts generated after `since` (a timestamp), newest first. Without a
+        previous visit, the alerts of the latest generation.
+        """
+        times, records = self._by_mentor.get(mentor_id, ([], []))
+        start = bisect_left(times, self.latest) if since is None else bisect_right(times, since)
+        return records[start:][::-1]
+
+
+class VisitLog:
+    """
+    When each mentor logged in, kept in mentor_visits.jsonl so the alert feed can say what is new.
+    A login appends one line, and every process (e.g. each worker of a WSGI server) reads the lines
+    the others appended, so all of them agree on each mentor's previous visit.
+    """
+
+    def __init__(self, path=VISITS_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._visits = {}  # mentor -> [previous visit, last visit]
+        self._file_id = None  # (device, inode) of the file read so far; compaction replaces the file
+        self._offset = 0
+        self._lines = 0
+        with self._lock:
+            self._refresh()
+
+    def _refresh(self):
+        """Reads the visits appended since the last read (all of them if the file was replaced)."""
+        try:
+            stat = os.stat(self.path)
+            if (stat.st_dev, stat.st_ino) == self._file_id and stat.st_size == self._offset:
+                return
+            with open(self.path, 'rb') as f:
+                stat = os.fstat(f.fileno())
+                if (stat.st_dev, stat.st_ino) != self._file_id or stat.st_size < self._offset:
+                    self._visits, self._file_id, self._offset, self._lines = {}, (stat.st_dev, stat.st_ino), 0, 0
+                f.seek(self._offset)
+                data = f.read()
+        except OSError:
+            return
+        end = data.rfind(b'\n') + 1  # a line still being written is read next time
+        for line in data[:end].splitlines():
+            try:
+                visit = json.loads(line)
+                key, at = str(visit['mentor_id']), visit['at']
+            except (ValueError, KeyError, TypeError):
+                continue
+            self._visits[key] = [self._visits.get(key, [None, None])[1], at]
+            self._lines += 1
+        self._offset += end
+
+    def _compact(self):
+        """Rewrites the file with only the last two visits of each mentor."""
+        with visits_lock(self.path, exclusive=True):
+            self._refresh()
+            tmp_path = f'{self.path}.tmp-{os.getpid()}-{threading.get_ident()}'
+            with open(tmp_path, 'w') as f:
+                for key, visits in self._visits.items():
+                    for at in visits:
+                        if at is not None:
+                            f.write(json.dumps({'mentor_id': key, 'at': at}) + '\n')
+            os.replace(tmp_path, self.path)
+            self._refresh()
+
+    def record(self, mentor_id, now=None):
+        """Records a login and returns the time of the visit before it (None on a first visit)."""
+        key = str(mentor_id)
+        at = timestamp(now)
+        try:
+            with visits_lock(self.path), open(self.path, 'a') as f:
+                f.write(json.dumps({'mentor_id': key, 'at': at}) + '\n')
+        except OSError as e:
+            print(f"Warning: could not save '{self.path}' ({e}).")
+            with self._lock:
+                self._visits[key] = [self._visits.get(key, [None, None])[1], at]
+                return self._visits[key][0]
+        with self._lock:
+            self._refresh()
+            previous = self._visits.get(key, [None, None])[0]
+            if self._lines > max(VISITS_COMPACT_LINES, VISITS_COMPACT_FACTOR * len(self._visits)):
+                try:
+                    self._compact()
+                except OSError as e:
+                    print(f"Warning: could not compact '{self.path}' ({e}).")
+        return previous
+
+    def since(self, mentor_id):
+        """The visit before the mentor's current one, or None."""
+        with self._lock:
+            self._refresh()
+            return self._visits.get(str(mentor_id), [None, None])[0]
+
+
+@contextmanager
+def visits_lock(path, exclusive=False):
+    """
+    A lock on '<path>.lock': appends share it and compaction holds it alone, so no login is
+    appended to a file that is being replaced.
+    """
+    if fcntl is None:
+        yield
+        return
+    with open(f'{path}.lock', 'a') as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
@@ -1,10 +1,23 @@
 import dash
 from dash import dcc, html, Input, Output, State, dash_table
 import pandas as pd
+import math
 import sys
 import plotly.graph_objects as go
 from datetime import date
-import json
+
+from ledger_builder import build_student_ledger
+from alert_feed import ALERT_FEED_PATH, ALERT_LABELS, AlertFeed, VisitLog
+from ingest_schema import read_input
+from ledger_index import IndexedLedger, MentorDirectory
+from ledger_refresher import WATCHED_PATHS, LedgerHandle, LedgerRefresher
+from ledger_store import start_ledger
+from mentor_rollups import ROLLUP_INPUT_COLUMNS, MentorRollups, band_count_column
+from pipeline_profiler import NULL_PROFILER, StageProfiler, profiling_requested
+from risk_calculator import band_display, risk_band_labels
+from table_query import PREVIEW_TABLE_PAGE_SIZE, STUDENT_TABLE_PAGE_SIZE, filter_rows, page_of, sort_rows
+from session_cache import (PAGE_CACHE_SIZE, PAGE_TTL_SECONDS, SLICE_CACHE_SIZE, SLICE_TTL_SECONDS, SessionStore,
+                           TTLCache, serialize_layout)
 
 # --- Custom Styles & Colors ---
 COLOR_GREEN = '#2E7D32'  # Darker Green
@@ -22,105 +35,120 @@ CARD_STYLE = {
 }
 
 
-# --- Data Processing and Risk Calculation Functions (Kept for self-sufficiency) ---
-def calculate_risk(student):
-    risk_score = 0
-    risk_reasons = []
-    attendance = student.get('rolling_attendance_90d')
-    if pd.notna(attendance):
-        if 70 <= attendance < 85:
-            risk_score += 10; risk_reasons.append(f"Attendance {attendance:.2f}% (70-85)")
-        elif 50 <= attendance < 70:
-            risk_score += 25; risk_reasons.append(f"Attendance {attendance:.2f}% (50-70)")
-        elif attendance < 50:
-            risk_score += 50; risk_reasons.append(f"Attendance {attendance:.2f}% (<50%)")
-    overall_avg_score = student.get('overall_avg_score')
-    if pd.notna(overall_avg_score):
-        if 50 <= overall_avg_score < 60:
-            risk_score += 10; risk_reasons.append(f"Overall Avg Score {overall_avg_score:.2f}% (50-60%)")
-        elif 35 <= overall_avg_score < 50:
-            risk_score += 25; risk_reasons.append(f"Overall Avg Score {overall_avg_score:.2f}% (35-50%)")
-        elif overall_avg_score < 35:
-            risk_score += 50; risk_reasons.append(f"Overall Avg Score {overall_avg_score:.2f}% (<35%)")
-    overdue_days = student.get('overdue_days', 0)
-    if pd.notna(overdue_days):
-        if 1 <= overdue_days <= 30:
-            risk_score += 10; risk_reasons.append(f"Overdue fees (1-30 days)")
-        elif 31 <= overdue_days <= 90:
-            risk_score += 25; risk_reasons.append(f"Overdue fees (31-90 days)")
-        elif overdue_days > 90:
-            risk_score += 40; risk_reasons.append(f"Overdue fees (>90 days)")
-    if student.get('max_attempts_overall', 0) >= 2: risk_score += 15; risk_reasons.append(
-        "Exhausted attempts for at least one subject")
-    if student.get('max_attempts_overall', 0) >= 3: risk_score += 35; risk_reasons.append(
-        "Attempts limit reached for at least one subject")
-    return risk_score, risk_reasons
-
-
-def map_risk_band(score):
-    if score >= 100:
-        return 'Red'
-    elif score >= 40:
-        return 'Amber'
-    else:
-        return 'Green'
-
-
-def run_data_pipeline():
+# --- Data Processing (risk rules live in risk_calculator.py) ---
+def run_data_pipeline(profile=False):
+    profiler = StageProfiler('app_mentor', memory=profile == 'memory') if profile else NULL_PROFILER
     try:
-        students_df = pd.read_csv('students.csv')
-        attendance_df = pd.read_csv('attendance.csv')
-        assessments_df = pd.read_csv('assessments.csv')
-        fees_df = pd.read_csv('fees.csv')
-        mentors_df = pd.read_csv('mentors.csv')
+        students_df = profiler.run('read_students', read_input, 'students')
+        attendance_df = profiler.run('read_attendance', read_input, 'attendance')
+        assessments_df = profiler.run('read_assessments', read_input, 'assessments')
+        fees_df = profiler.run('read_fees', read_input, 'fees')
+        mentors_df = profiler.run('read_mentors', read_input, 'mentors')
     except FileNotFoundError:
         print("Error: Required CSV files not found. Please run university_data_generator.py first.")
         sys.exit(1)
 
     # FUSE DATA & CALCULATE RISK
-    student_ledger = students_df.copy()
-    attendance_summary = attendance_df.groupby('student_id')['status'].apply(
-        lambda x: (x == 'Present').sum() / len(x) * 100 if len(x) > 0 else 0
-    ).reset_index(name='rolling_attendance_90d')
-    student_ledger = student_ledger.merge(attendance_summary, on='student_id', how='left')
-
-    assessments_df['date'] = pd.to_datetime(assessments_df['date'])
-    assessments_summary = assessments_df.groupby('student_id').agg(
-        overall_avg_score=('score', 'mean'),
-        max_attempts_overall=('attempts', 'max')
-    ).reset_index()
-    student_ledger = student_ledger.merge(assessments_summary, on='student_id', how='left')
-
-    assessments_summary_pivot = assessments_df.groupby(['student_id', 'subject'])[
-        'score'].mean().unstack().reset_index()
-    assessments_summary_pivot.columns = ['student_id'] + [f'avg_score_{col}' for col in
-                                                          assessments_summary_pivot.columns[1:]]
-    student_ledger = student_ledger.merge(assessments_summary_pivot, on='student_id', how='left')
-
-    fees_df['due_date'] = pd.to_datetime(fees_df['due_date'])
-    current_date = pd.to_datetime(date.today())
-    fees_df['overdue_days'] = (current_date - fees_df['due_date']).dt.days.fillna(0).astype(int)
-    fees_summary = fees_df[['student_id', 'amount_due', 'amount_paid', 'status', 'overdue_days']]
-    student_ledger = student_ledger.merge(fees_summary, on='student_id', how='left')
-
-    student_ledger[['risk_score', 'risk_reasons']] = student_ledger.apply(
-        lambda row: pd.Series(calculate_risk(row)), axis=1
-    )
-    student_ledger['risk_band'] = student_ledger['risk_score'].apply(map_risk_band)
-    student_ledger['risk_reasons'] = student_ledger['risk_reasons'].apply(
-        lambda x: ', '.join(x) if isinstance(x, list) else str(x))
+    student_ledger = build_student_ledger(students_df, attendance_df, assessments_df, fees_df, profiler=profiler)
 
+    profiler.report()
     return student_ledger, mentors_df
 
 
-# Load and process data at startup
-student_ledger_df, mentors_df = run_data_pipeline()
+# The ledger being served: callbacks read `ledger_handle.state` once and use that state throughout
+ledger_handle = LedgerHandle()
+
+
+def set_ledger(student_ledger, mentors, columnar_ledger=None):
+    """
+    Builds the lookup indexes and per-mentor KPI rollups for a ledger (or, when student_ledger
+    is None, a memory-mapped snapshot) and the mentors, loads the alert feed, then swaps them in
+    as the next ledger version.
+    """
+    rollup_input = student_ledger if student_ledger is not None else columnar_ledger.read(ROLLUP_INPUT_COLUMNS)
+    return ledger_handle.publish(
+        student_ledger=student_ledger,
+        mentors=mentors,
+        index=columnar_ledger if student_ledger is None else IndexedLedger(student_ledger),
+        mentor_directory=MentorDirectory(mentors),
+        rollups=MentorRollups.from_ledger(rollup_input),
+        alerts=AlertFeed.load(),
+    )
+
+
+def load_ledger(profile=False):
+    """Attaches to the latest ledger snapshot (rebuilding it only if it is missing or stale) and swaps it in."""
+    columnar_ledger, student_ledger = start_ledger(lambda: run_data_pipeline(profile=profile)[0])
+    return set_ledger(student_ledger, read_input('mentors'), columnar_ledger)
+
+
+# Load the ledger once at startup
+load_ledger(profile=profiling_requested())
+
+
+def get_assigned_students(mentor_id, state=None):
+    """Returns the ledger rows of a mentor's students through the mentor_id index."""
+    return (state or ledger_handle.state).index.read_mentor(mentor_id)
+
+
+# --- Server-side Sessions ---
+# The browser only holds an opaque session token; each mentor's slice of the ledger stays on the
+# server, keyed by (mentor_id, ledger version), so callbacks never re-parse a JSON copy of it.
+sessions = SessionStore()
+visit_log = VisitLog()  # when each mentor last logged in, so the bell shows what changed since then
+mentor_slices = TTLCache(maxsize=SLICE_CACHE_SIZE, ttl=SLICE_TTL_SECONDS)
+# Serialized dashboard pages, keyed by (mentor_id, page, ledger version, previous visit): a repeat
+# visit skips the layout entirely
+rendered_pages = TTLCache(maxsize=PAGE_CACHE_SIZE, ttl=PAGE_TTL_SECONDS)
+# Filtered and sorted views of a slice behind the server-side tables, so a page change only slices rows
+table_views = TTLCache(maxsize=SLICE_CACHE_SIZE, ttl=SLICE_TTL_SECONDS)
+
+
+def get_cached_students(mentor_id, state):
+    """The mentor's slice of one ledger version, from the slice cache."""
+    return mentor_slices.get_or_compute((mentor_id, state.version), lambda: get_assigned_students(mentor_id, state))
+
+
+def query_students(mentor_id, state, filter_query=None, sort_by=None, branches=None, risk_bands=None):
+    """The mentor's students filtered and sorted the way a table asks, from the cached slice."""
+    key = (mentor_id, state.version, filter_query or '',
+           tuple((entry['column_id'], entry['direction']) for entry in sort_by or []),
+           tuple(branches or ()), tuple(risk_bands or ()))
+
+    def compute():
+        students = get_cached_students(mentor_id, state)
+        if branches:
+            students = students[students['branch'].isin(branches)]
+        if risk_bands:
+            students = students[students['risk_band'].isin(risk_bands)]
+        return sort_rows(filter_rows(students, filter_query), sort_by)
+
+    return table_views.get_or_compute(key, compute)
+
+
+def reload_ledger():
+    """Runs on the refresher thread: loads the new ledger, swaps it in and drops the old version's slices and pages."""
+    state = load_ledger()
+    mentor_slices.clear()
+    rendered_pages.clear()
+    table_views.clear()
+    print(f"Ledger reloaded (version {state.version}).")
+
+
+# Watches the input CSV files and the ledger snapshot; started by the first request a server handles
+refresher = LedgerRefresher(reload_ledger, watch_paths=WATCHED_PATHS + ['mentors.csv', ALERT_FEED_PATH])
+
 
 # Initialize the Dash app
 app = dash.Dash(__name__, external_stylesheets=['https://codepen.io/chriddyp/pen/bWLwgP.css'])
 server = app.server
 
 
+@server.before_request
+def start_refresher():
+    refresher.start()
+
+
 # --- Component Layouts ---
 
 def get_navbar(mentor_id, notification_count):
@@ -155,7 +183,7 @@ def get_navbar(mentor_id, notification_count):
             html.Button(
                 f'🔔 ({notification_count})',
                 id='notification-button',
-                title='Red Zone Students',
+                title='Changes since your last visit',
                 n_clicks=0,  # Added n_clicks for stability
                 style={
                     'marginLeft': 'auto',
@@ -174,8 +202,8 @@ def get_navbar(mentor_id, notification_count):
     ])
 
 
-def get_overview_page(assigned_students, notification_count, amber_count, green_count):
-    """Generates the main Overview Dashboard layout with charts and KPIs."""
+def get_overview_page(kpis, branches):
+    """Generates the main Overview Dashboard layout with charts and KPIs (from the mentor's rollup)."""
     COLOR_RED = '#C62828'
     COLOR_AMBER = '#FFB300'
     COLOR_GREEN = '#2E7D32'
@@ -189,16 +217,24 @@ def get_overview_page(assigned_students, notification_count, amber_count, green_
         'transition': 'all 0.3s ease-in-out',
     }
 
-    risk_counts = assigned_students['risk_band'].value_counts()
+    # Students per band of the rule file, however many bands it has (zero for a band the rollups do not have);
+    # the cards show the highest-risk band, the bands in between and the lowest-risk band
+    labels = list(risk_band_labels())
+    risk_counts = pd.Series([kpis.get(band_count_column(label), 0) for label in labels], index=labels, dtype=int)
+    notification_count = risk_counts.iloc[0]
+    amber_count = risk_counts.iloc[1:-1].sum()
+    green_count = risk_counts.iloc[-1] if len(labels) > 1 else 0
+    band_colors = {label: COLOR_AMBER for label in labels} | {labels[0]: COLOR_RED, labels[-1]: COLOR_GREEN}
+    risk_counts = risk_counts[risk_counts > 0].sort_values(ascending=False, kind='stable')
 
     risk_fig = go.Figure(data=[go.Pie(
         labels=risk_counts.index,
         values=risk_counts.values,
         hole=.3,
-        marker_colors=[COLOR_RED, COLOR_AMBER, COLOR_GREEN],
+        marker_colors=[band_colors[label] for label in risk_counts.index],
         hoverinfo='label+percent',
         textinfo='value',
-        pull=[0.05 if label == 'Red' else 0 for label in risk_counts.index]
+        pull=[0.05 if label == labels[0] else 0 for label in risk_counts.index]
     )])
     risk_fig.update_layout(
         title_text="Risk Distribution",
@@ -217,7 +253,7 @@ def get_overview_page(assigned_students, notification_count, amber_count, green_
                 html.Div(style={**CARD_STYLE, 'borderBottom': f'5px solid {COLOR_PRIMARY}', 'textAlign': 'center',
                                 'backgroundColor': COLOR_PRIMARY, 'color': 'white'}, children=[
                     html.P("Total Students 👨‍🎓", style={'fontSize': '1.0em', 'opacity': '0.9', 'marginBottom': '5px'}),
-                    html.P(f"{len(assigned_students)}", style={'fontSize': '2.8em', 'fontWeight': '900', 'margin': '0'})
+                    html.P(f"{kpis['n_students']}", style={'fontSize': '2.8em', 'fontWeight': '900', 'margin': '0'})
                 ]),
                 html.Div(style={**CARD_STYLE, 'borderBottom': f'5px solid {COLOR_RED}', 'textAlign': 'center',
                                 'backgroundColor': COLOR_RED, 'color': 'white'}, children=[
@@ -260,7 +296,7 @@ def get_overview_page(assigned_students, notification_count, amber_count, green_
                                             style={'fontWeight': 'bold', 'display': 'block', 'marginBottom': '5px'}),
                                  dcc.Dropdown(
                                      id='branch-filter-overview',
-                                     options=[{'label': i, 'value': i} for i in assigned_students['branch'].unique()],
+                                     options=[{'label': b['branch'], 'value': b['branch']} for b in branches],
                                      placeholder="Select Branch(es)",
                                      multi=True,
                                      style={'borderRadius': '4px'}
@@ -272,11 +308,8 @@ def get_overview_page(assigned_students, notification_count, amber_count, green_
                                             style={'fontWeight': 'bold', 'display': 'block', 'marginBottom': '5px'}),
                                  dcc.Dropdown(
                                      id='risk-band-filter-overview',
-                                     options=[
-                                         {'label': 'Red (High)', 'value': 'Red'},
-                                         {'label': 'Amber (Medium)', 'value': 'Amber'},
-                                         {'label': 'Green (Low)', 'value': 'Green'}
-                                     ],
+                                     options=[{'label': band_display(label), 'value': label}
+                                              for label in risk_band_labels()],
                                      placeholder="Select Risk Band(s)",
                                      multi=True,
                                      style={'borderRadius': '4px'}
@@ -314,6 +347,9 @@ def get_all_students_page(assigned_students):
          'backgroundColor': 'rgba(46, 125, 50, 0.1)', 'color': COLOR_GREEN, 'fontWeight': 'bold'}
     ]
 
+    # Only the first page is sent; update_students_table answers paging, sorting and filtering
+    first_page, _, page_count = page_of(assigned_students, 0, STUDENT_TABLE_PAGE_SIZE)
+
     return html.Div(style={'padding': '30px', 'maxWidth': '1400px', 'margin': 'auto'}, children=[
         html.H3("Comprehensive List of Assigned Students",
                 style={'color': COLOR_PRIMARY, 'marginBottom': '20px', 'borderBottom': '1px solid #e0e0e0',
@@ -335,12 +371,15 @@ def get_all_students_page(assigned_students):
                     {"name": "Overdue Days", "id": "overdue_days", "type": "numeric"},
                     {"name": "Risk Reasons", "id": "risk_reasons", "presentation": "markdown"}
                 ],
-                data=assigned_students.to_dict('records'),
-                sort_action="native",
-                filter_action="native",
-                page_action="native",
+                data=first_page,
+                sort_action="custom",
+                sort_by=[],
+                filter_action="custom",
+                filter_query='',
+                page_action="custom",
                 page_current=0,
-                page_size=15,
+                page_size=STUDENT_TABLE_PAGE_SIZE,
+                page_count=page_count,
                 style_cell={'textAlign': 'left', 'padding': '12px', 'fontSize': '14px',
                             'borderBottom': '1px solid #e0e0e0', 'whiteSpace': 'normal'},
                 style_header={'backgroundColor': COLOR_PRIMARY, 'color': 'white', 'fontWeight': 'bold',
@@ -352,6 +391,64 @@ def get_all_students_page(assigned_students):
     ])
 
 
+def format_alert(alert):
+    """One alert feed record as a row of the alerts table."""
+    previous_score = '–' if math.isnan(alert['previous_score']) else f"{alert['previous_score']:.1f}"
+    return {
+        'name': alert['name'],
+        'branch': alert['branch'],
+        'alert': ALERT_LABELS[alert['alert']],
+        'risk_band': f"{alert['previous_band'] or 'New'} → {alert['risk_band']}",
+        'risk_score': f"{previous_score} → {alert['risk_score']:.1f}",
+        'risk_reasons': alert['risk_reasons'],
+    }
+
+
+def get_red_zone_modal(alerts):
+    """Generates the (hidden) alerts modal opened by the notification bell: band changes since the last visit."""
+    modal_content = html.Div(style={
+        'backgroundColor': 'white', 'margin': '10% auto', 'padding': '30px', 'borderRadius': '8px', 'width': '80%',
+        'max-width': '1000px', 'boxShadow': '0 10px 30px rgba(0,0,0,0.3)'
+    }, children=[
+        html.Span('✖️', id='close-modal', n_clicks=0,
+                  style={'float': 'right', 'fontSize': '28px', 'cursor': 'pointer', 'color': COLOR_BG_DARK}),
+        html.H3('🚨 Risk Changes Since Your Last Visit',
+                style={'color': COLOR_RED, 'borderBottom': f'2px solid #e0e0e0', 'paddingBottom': '10px',
+                       'marginBottom': '20px'}),
+        dash_table.DataTable(
+            id='red-zone-table',
+            columns=[
+                {"name": "Student Name", "id": "name"},
+                {"name": "Branch", "id": "branch"},
+                {"name": "Change", "id": "alert"},
+                {"name": "Risk Band", "id": "risk_band"},
+                {"name": "Risk Score", "id": "risk_score"},
+                {"name": "Reasons", "id": "risk_reasons"}
+            ],
+            data=[format_alert(alert) for alert in alerts],
+            style_data_conditional=[
+                {'if': {'row_index': 'odd'}, 'backgroundColor': COLOR_BG_LIGHT},
+                {'if': {'filter_query': '{alert} = "Newly Red"', 'column_id': 'alert'},
+                 'color': COLOR_RED, 'fontWeight': 'bold'},
+                {'if': {'filter_query': '{alert} = "Improved"', 'column_id': 'alert'},
+                 'color': COLOR_GREEN, 'fontWeight': 'bold'},
+            ],
+            style_header={'backgroundColor': COLOR_RED, 'color': 'white', 'fontWeight': 'bold'},
+            style_cell={'textAlign': 'left', 'whiteSpace': 'normal', 'minWidth': '120px', 'width': '120px',
+                        'maxWidth': '300px'},
+        ) if alerts else html.P('No changes since your last visit.', id='red-zone-table',
+                                style={'color': COLOR_BG_DARK, 'fontStyle': 'italic'})
+    ])
+
+    # Hidden until the bell is clicked (see the clientside callback below)
+    return html.Div(id='notification-modal', children=modal_content, style={
+        'display': 'none',
+        'position': 'fixed', 'zIndex': '1001', 'left': '0', 'top': '0',
+        'width': '100%', 'height': '100%', 'overflow': 'auto',
+        'backgroundColor': 'rgba(0,0,0,0.5)'
+    })
+
+
 def get_login_layout(status_message=""):
     """Helper function to return the login page layout."""
     COLOR_PRIMARY = '#1976D2'
@@ -383,14 +480,10 @@ def get_login_layout(status_message=""):
 # --- App Layout (Initial) ---
 app.layout = html.Div(children=[
     # Persistent Stores
-    dcc.Store(id='mentor-data-store', data=json.dumps({})),
+    dcc.Store(id='session-token-store', data=None),
     dcc.Store(id='login-id-store', data=None),
     dcc.Location(id='url', refresh=False),
 
-    # Hidden components for modal logic
-    html.Button(id='close-modal', n_clicks=0, style={'display': 'none'}),
-    html.Div(id='notification-modal', style={'display': 'none'}),  # Will be updated by toggle_modal
-
     # Main content wrapper (holds login page or dashboard)
     html.Div(id='page-content-wrapper', style={'backgroundColor': '#F5F5F5', 'minHeight': '100vh'})
 ])
@@ -400,7 +493,7 @@ app.layout = html.Div(children=[
 
 @app.callback(
     # Only updates data stores and URL on successful login
-    Output('mentor-data-store', 'data'),
+    Output('session-token-store', 'data'),
     Output('login-id-store', 'data'),
     Output('url', 'pathname', allow_duplicate=True),
     Output('login-status', 'children'),
@@ -414,21 +507,20 @@ def login_callback(n_clicks, login_id, password, current_pathname):
     if n_clicks is None or n_clicks == 0:
         return dash.no_update, dash.no_update, dash.no_update, dash.no_update
 
-    mentor_data = mentors_df[(mentors_df['login_id'] == login_id) & (mentors_df['password'] == password)]
+    state = ledger_handle.state
+    mentor = state.mentor_directory.authenticate(login_id, password)
 
-    if not mentor_data.empty:
-        mentor_id = mentor_data.iloc[0]['mentor_id']
-        assigned_students = student_ledger_df[student_ledger_df['mentor_id'] == mentor_id]
-
-        # Prepare data for JSON storage
-        df_for_json = assigned_students.copy()
-        df_for_json['risk_reasons'] = df_for_json['risk_reasons'].astype(str)
-        student_data_json = df_for_json.to_json(date_format='iso', orient='split')
+    if mentor is not None:
+        mentor_id = int(mentor['mentor_id'])
+        # The browser only gets a session token; the students stay in the server-side cache
+        session_token = sessions.start(mentor_id)
+        visit_log.record(mentor_id)
+        mentor_slices.put((mentor_id, state.version), get_assigned_students(mentor_id, state))
 
         # Success: Update stores, and redirect ONLY if not already on the overview page
         target_pathname = '/overview' if current_pathname not in ['/overview', '/all-students'] else dash.no_update
 
-        return student_data_json, mentor_id, target_pathname, ''
+        return session_token, mentor_id, target_pathname, ''
     else:
         # Failure: No update to stores/URL, just update the status message
         return dash.no_update, dash.no_update, dash.no_update, '❌ Invalid login credentials.'
@@ -440,118 +532,74 @@ def login_callback(n_clicks, login_id, password, current_pathname):
     Output('url', 'pathname', allow_duplicate=True),
     Input('url', 'pathname'),
     State('login-id-store', 'data'),
-    State('mentor-data-store', 'data'),
+    State('session-token-store', 'data'),
     # FIX: Change to 'initial_duplicate' to satisfy Dash's rule for allow_duplicate output
     prevent_initial_call='initial_duplicate'
 )
-def route_callback(pathname, mentor_id, student_data_json):
-    # 1. AUTHENTICATION & INITIAL CHECK
-    if not mentor_id or student_data_json == json.dumps({}) or student_data_json is None:
+def route_callback(pathname, mentor_id, session_token):
+    # 1. AUTHENTICATION (the session token maps to a mentor on the server)
+    mentor_id = sessions.user(session_token)
+    if mentor_id is None:
+        status_message = 'Your session has expired. Please log in again.' if session_token else ''
         # If user is trying to access a restricted page, redirect to login
         if pathname not in ['/', '/login']:
-            return get_login_layout(), '/'
-        return get_login_layout(), dash.no_update
-
-    # 2. DATA LOAD
-    try:
-        assigned_students = pd.read_json(student_data_json, orient='split')
-        if assigned_students.empty:
-            return get_login_layout(f"Welcome Mentor {mentor_id}, but you have no students assigned."), dash.no_update
-    except Exception:
-        # If JSON parsing fails (e.g., bad session data) -> force logout/login
-        return get_login_layout('Session data corrupted. Please log in again.'), '/'
-
-    # 3. KPI CALCULATIONS
-    red_zone_students = assigned_students[assigned_students['risk_band'].str.contains('Red')]
-    amber_zone_students = assigned_students[assigned_students['risk_band'].str.contains('Amber')]
-    green_zone_students = assigned_students[assigned_students['risk_band'].str.contains('Green')]
-    notification_count = len(red_zone_students)
-
-    navbar = get_navbar(mentor_id, notification_count)
-
-    # 4. PAGE SELECTION
-    if pathname == '/overview' or pathname == '/':
-        content = get_overview_page(assigned_students, notification_count, len(amber_zone_students),
-                                    len(green_zone_students))
-    elif pathname == '/all-students':
-        content = get_all_students_page(assigned_students)
-    else:
+            return get_login_layout(status_message), '/'
+        return get_login_layout(status_message), dash.no_update
+    # 2. KPIS (rolled up per mentor when the ledger was loaded)
+    state = ledger_handle.state
+    kpis = state.rollups.get(mentor_id)
+    if kpis['n_students'] == 0:
+        return get_login_layout(f"Welcome Mentor {mentor_id}, but you have no students assigned."), dash.no_update
+
+    # 3. PAGE SELECTION
+    if pathname not in ['/overview', '/', '/all-students']:
         # Redirect to overview if an invalid path is hit while logged in
         return html.Div(), '/overview'
+    page = '/all-students' if pathname == '/all-students' else '/overview'
+
+    # 4. LAYOUT (built once per mentor, page, ledger version and previous visit, then served from the page cache)
+    since = visit_log.since(mentor_id)
+    layout = rendered_pages.get_or_compute(
+        (mentor_id, page, state.version, since),
+        lambda: serialize_layout(render_page(mentor_id, page, kpis, state, since)))
+    return layout, dash.no_update
+
+
+def render_page(mentor_id, page, kpis, state, since=None):
+    """
+    Builds the navbar, the alerts modal (the mentor's alerts since the `since` visit) and the
+    requested page for one mentor from one ledger state.
+    """
+    alerts = state.alerts.since(mentor_id, since)
+    navbar = get_navbar(mentor_id, len(alerts))
+    if page == '/overview':
+        content = get_overview_page(kpis, state.rollups.branches(mentor_id))
+    else:
+        content = get_all_students_page(get_cached_students(mentor_id, state))
 
-    # 5. FINAL LAYOUT COMPOSITION
     return html.Div([
         navbar,
+        get_red_zone_modal(alerts),
         content
-    ], style={'padding': '0', 'backgroundColor': COLOR_BG_LIGHT, 'minHeight': '100vh'}), dash.no_update
+    ], style={'padding': '0', 'backgroundColor': COLOR_BG_LIGHT, 'minHeight': '100vh'})
 
 
-@app.callback(
-    # Modal logic must be handled separately for stability
-    Output('notification-modal', 'children'),
+# Showing and hiding the red-zone modal happens in the browser: the modal's content is part of the
+# cached page, so opening or closing the bell costs no server round trip
+app.clientside_callback(
+    """
+    function(openClicks, closeClicks, style) {
+        const triggered = window.dash_clientside.callback_context.triggered.map(t => t.prop_id);
+        const display = triggered.includes('notification-button.n_clicks') ? 'block' : 'none';
+        return Object.assign({}, style, {display: display});
+    }
+    """,
     Output('notification-modal', 'style'),
     Input('notification-button', 'n_clicks'),
     Input('close-modal', 'n_clicks'),
-    State('mentor-data-store', 'data'),
+    State('notification-modal', 'style'),
     prevent_initial_call=True
 )
-def toggle_modal(open_clicks, close_clicks, student_data_json):
-    ctx = dash.callback_context
-    if not ctx.triggered:
-        raise dash.exceptions.PreventUpdate
-
-    button_id = ctx.triggered[0]['prop_id'].split('.')[0]
-
-    # Default style is hidden
-    style_copy = {
-        'display': 'none',
-        'position': 'fixed', 'zIndex': '1001', 'left': '0', 'top': '0',
-        'width': '100%', 'height': '100%', 'overflow': 'auto',
-        'backgroundColor': 'rgba(0,0,0,0.5)'
-    }
-
-    # 1. Determine visibility
-    if button_id == 'notification-button':
-        style_copy['display'] = 'block'
-    elif button_id == 'close-modal':
-        style_copy['display'] = 'none'
-
-    # 2. Generate content (must be generated regardless of visibility change)
-    if student_data_json and student_data_json != json.dumps({}):
-        try:
-            assigned_students = pd.read_json(student_data_json, orient='split')
-            red_zone_students = assigned_students[assigned_students['risk_band'].str.contains('Red')]
-        except Exception:
-            red_zone_students = pd.DataFrame()
-    else:
-        red_zone_students = pd.DataFrame()
-
-    modal_content = html.Div(style={
-        'backgroundColor': 'white', 'margin': '10% auto', 'padding': '30px', 'borderRadius': '8px', 'width': '80%',
-        'max-width': '1000px', 'boxShadow': '0 10px 30px rgba(0,0,0,0.3)'
-    }, children=[
-        html.Span('✖️', id='close-modal', n_clicks=0,
-                  style={'float': 'right', 'fontSize': '28px', 'cursor': 'pointer', 'color': COLOR_BG_DARK}),
-        html.H3('🚨 Red Zone Student Alerts',
-                style={'color': COLOR_RED, 'borderBottom': f'2px solid #e0e0e0', 'paddingBottom': '10px',
-                       'marginBottom': '20px'}),
-        dash_table.DataTable(
-            id='red-zone-table',
-            columns=[
-                {"name": "Student Name", "id": "name"},
-                {"name": "Branch", "id": "branch"},
-                {"name": "Risk Score", "id": "risk_score"},
-                {"name": "Reasons", "id": "risk_reasons"}
-            ],
-            data=red_zone_students.to_dict('records'),
-            style_data_conditional=[{'if': {'row_index': 'odd'}, 'backgroundColor': COLOR_BG_LIGHT}],
-            style_header={'backgroundColor': COLOR_RED, 'color': 'white', 'fontWeight': 'bold'},
-            style_cell={'textAlign': 'left', 'whiteSpace': 'normal', 'minWidth': '120px', 'width': '120px',
-                        'maxWidth': '300px'},
-        )
-    ])
-
-    return modal_content, style_copy
 
 
 @app.callback(
@@ -559,29 +607,22 @@ def toggle_modal(open_clicks, close_clicks, student_data_json):
     Output('filtered-table-container', 'children'),
     Input('branch-filter-overview', 'value'),
     Input('risk-band-filter-overview', 'value'),
-    State('mentor-data-store', 'data'),
+    State('session-token-store', 'data'),
     prevent_initial_call=False
 )
-def update_table(selected_branches, selected_risk_bands, student_data_json):
-    # CRASH FIX: Check for empty/default data
-    if student_data_json is None or student_data_json == json.dumps({}):
+def update_table(selected_branches, selected_risk_bands, session_token):
+    # CRASH FIX: Check for a missing or expired session
+    mentor_id = sessions.user(session_token)
+    if mentor_id is None:
         # Returns an empty container element instead of crashing
         return html.Div(id='empty-table-container', children=[
             html.P("Log in to view student data.", style={'color': COLOR_RED})
         ])
 
-    try:
-        assigned_students = pd.read_json(student_data_json, orient='split')
-        df_filtered = assigned_students.copy()
-    except Exception:
-        return html.P("Error loading student data.", style={'color': COLOR_RED})
-
-    # Apply filters
-    if selected_branches:
-        df_filtered = df_filtered[df_filtered['branch'].isin(selected_branches)]
-
-    if selected_risk_bands:
-        df_filtered = df_filtered[df_filtered['risk_band'].isin(selected_risk_bands)]
+    # Apply filters (the preview sends one page; update_preview_table answers paging and sorting)
+    df_filtered = query_students(mentor_id, ledger_handle.state, branches=selected_branches,
+                                 risk_bands=selected_risk_bands)
+    first_page, _, page_count = page_of(df_filtered, 0, PREVIEW_TABLE_PAGE_SIZE)
 
     # Conditional Formatting
     style_data_conditional = [
@@ -601,9 +642,13 @@ def update_table(selected_branches, selected_risk_bands, student_data_json):
             {"name": "Risk Band", "id": "risk_band"},
             {"name": "Risk Score", "id": "risk_score", "type": "numeric"}
         ],
-        data=df_filtered.head(5).to_dict('records'),
-        sort_action="native",
-        page_action="none",
+        data=first_page,
+        sort_action="custom",
+        sort_by=[],
+        page_action="custom",
+        page_current=0,
+        page_size=PREVIEW_TABLE_PAGE_SIZE,
+        page_count=page_count,
         style_cell={'textAlign': 'left', 'padding': '8px', 'fontSize': '12px'},
         style_header={'backgroundColor': COLOR_PRIMARY, 'color': 'white', 'fontWeight': 'bold'},
         style_data_conditional=style_data_conditional,
@@ -611,8 +656,46 @@ def update_table(selected_branches, selected_risk_bands, student_data_json):
     )
 
 
+@app.callback(
+    # Server-side paging, sorting and filtering of the full students table
+    Output('full-students-table', 'data'),
+    Output('full-students-table', 'page_current'),
+    Output('full-students-table', 'page_count'),
+    Input('full-students-table', 'page_current'),
+    Input('full-students-table', 'sort_by'),
+    Input('full-students-table', 'filter_query'),
+    State('session-token-store', 'data'),
+    prevent_initial_call=True
+)
+def update_students_table(page_current, sort_by, filter_query, session_token):
+    mentor_id = sessions.user(session_token)
+    if mentor_id is None:
+        return [], 0, 1
+    students = query_students(mentor_id, ledger_handle.state, filter_query=filter_query, sort_by=sort_by)
+    return page_of(students, page_current, STUDENT_TABLE_PAGE_SIZE)
+
+
+@app.callback(
+    # Server-side paging and sorting of the overview's preview table
+    Output('table-preview', 'data'),
+    Output('table-preview', 'page_current'),
+    Output('table-preview', 'page_count'),
+    Input('table-preview', 'page_current'),
+    Input('table-preview', 'sort_by'),
+    State('branch-filter-overview', 'value'),
+    State('risk-band-filter-overview', 'value'),
+    State('session-token-store', 'data'),
+    prevent_initial_call=True
+)
+def update_preview_table(page_current, sort_by, selected_branches, selected_risk_bands, session_token):
+    mentor_id = sessions.user(session_token)
+    if mentor_id is None:
+        return [], 0, 1
+    students = query_students(mentor_id, ledger_handle.state, sort_by=sort_by, branches=selected_branches,
+                              risk_bands=selected_risk_bands)
+    return page_of(students, page_current, PREVIEW_TABLE_PAGE_SIZE)
+
+
 if __name__ == '__main__':
-    print("Running data pipeline...")
-    student_ledger_df, mentors_df = run_data_pipeline()
-    print("Data pipeline complete. Starting Dash server...")
+    print("Starting Dash server...")
     app.run(debug=True)
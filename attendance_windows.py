@@ -0,0 +1,246 @@
+import argparse
+import os
+import sys
+import time
+from datetime import date
+
+import numpy as np
+import pandas as pd
+
+from ingest_schema import read_input
+
+# --- Configuration for Attendance Windows ---
+ATTENDANCE_WINDOWS = [7, 30, 90]  # days, each ending on the attendance as-of day
+WINDOW_COLUMNS = [f'rolling_attendance_{days}d' for days in ATTENDANCE_WINDOWS]
+ATTENDANCE_RING_PATH = 'attendance_ring.npz'
+WINDOWS_PATH = 'attendance_windows.csv'
+MAX_ROWS_PER_DAY = np.iinfo(np.uint8).max  # attendance rows counted per student and day
+MISSING_DAY = np.iinfo(np.int64).min  # day number of a missing date; no window reaches it
+SPARSE_DAY_RATIO = 8  # a day with fewer than students / SPARSE_DAY_RATIO rows only touches its own students
+RING_ARRAYS = ['present', 'recorded', 'window_present', 'window_recorded']
+
+
+# --- Days ---
+def day_number(moment):
+    """Days since 1970-01-01 of a date or timestamp."""
+    return int(np.datetime64(pd.Timestamp(moment).date(), 'D').astype(np.int64))
+
+
+def day_string(day):
+    return str(np.datetime64(int(day), 'D'))
+
+
+def _to_days(values):
+    values = pd.DatetimeIndex(pd.to_datetime(values, errors='coerce')).tz_localize(None)
+    return values.to_numpy().astype('datetime64[D]').astype(np.int64)  # NaT becomes MISSING_DAY
+
+
+def attendance_days(dates):
+    """
+    Day number of every attendance date. Categorical dates (as the ingestion schema reads them)
+    are parsed once per distinct day; missing or unparseable dates get MISSING_DAY.
+    """
+    dates = pd.Series(dates)
+    if isinstance(dates.dtype, pd.CategoricalDtype):
+        days = np.append(_to_days(dates.cat.categories), MISSING_DAY)
+        return days[dates.cat.codes.to_numpy()]  # code -1 (missing) picks the sentinel
+    return _to_days(dates)
+
+
+def attendance_records(attendance_df):
+    """(student_id, day number, present) of every attendance row; only 'Present' counts as present."""
+    return (attendance_df['student_id'].to_numpy(), attendance_days(attendance_df['date']),
+            (attendance_df['status'] == 'Present').to_numpy())
+
+
+def latest_day(days, current_date=None):
+    """The day the windows end on: the latest attendance day on or before current_date (default today)."""
+    cap = day_number(current_date if current_date is not None else date.today())
+    recorded = days[(days <= cap) & (days != MISSING_DAY)]
+    return int(recorded.max()) if len(recorded) else cap
+
+
+# --- Day Ring Buffer ---
+class AttendanceRing:
+    """
+    Present and recorded attendance rows of every student for each of the last max(windows)
+    days, one (days x students) uint8 row per day in a ring indexed by day number, plus running
+    totals per window. Moving to the next day overwrites the oldest row and takes the days that
+    leave each window off its totals, so appending a day costs O(students) whatever the history.
+    """
+
+    def __init__(self, student_ids, as_of=None, windows=ATTENDANCE_WINDOWS):
+        self.student_ids = np.asarray(student_ids)
+        self.windows = list(windows)
+        self.days = max(self.windows)
+        self.as_of = as_of  # day number of the newest day in the ring (None until a day is added)
+        n = len(self.student_ids)
+        self.present = np.zeros((self.days, n), dtype=np.uint8)
+        self.recorded = np.zeros((self.days, n), dtype=np.uint8)
+        self.window_present = np.zeros((len(self.windows), n), dtype=np.int32)
+        self.window_recorded = np.zeros((len(self.windows), n), dtype=np.int32)
+        self._buffers = {name: getattr(self, name) for name in RING_ARRAYS}  # may hold spare columns, see grow
+
+    def __len__(self):
+        return len(self.student_ids)
+
+    def advance(self, day):
+        """Moves the ring forward to `day`, dropping every day that leaves a window."""
+        day = int(day)
+        if self.as_of is not None and day <= self.as_of:
+            return
+        if self.as_of is None or day - self.as_of >= self.days:
+            for name in RING_ARRAYS:
+                getattr(self, name)[:] = 0
+        else:
+            for new_day in range(self.as_of + 1, day + 1):
+                for i, window in enumerate(self.windows):
+                    leaving = (new_day - window) % self.days
+                    self.window_present[i] -= self.present[leaving]
+                    self.window_recorded[i] -= self.recorded[leaving]
+                self.present[new_day % self.days] = 0
+                self.recorded[new_day % self.days] = 0
+        self.as_of = day
+
+    def add(self, positions, days, is_present):
+        """
+        Counts attendance rows into the ring: positions are the students' columns (-1 skips a
+        row), days their day numbers. Rows outside the days the ring holds are ignored.
+        """
+        if self.as_of is None:
+            return
+        # Age in days of every row; rows the ring does not hold go to an extra age, which is skipped
+        ages = np.where((positions >= 0) & (days <= self.as_of) & (days > self.as_of - self.days),
+                        self.as_of - days, self.days).astype(np.int16)
+        # The rows are grouped by age with a (radix) sort, then counted one day at a time
+        rows = np.argsort(ages, kind='stable')
+        positions, is_present = positions[rows], is_present[rows]
+        bounds = np.concatenate([[0], np.cumsum(np.bincount(ages, minlength=self.days + 1))])
+        for age in np.flatnonzero(np.diff(bounds[:self.days + 1])):
+            day_positions = positions[bounds[age]:bounds[age + 1]]
+            day_present = is_present[bounds[age]:bounds[age + 1]]
+            if len(day_positions) * SPARSE_DAY_RATIO < len(self):
+                # A day with few rows (e.g. one chunk of a streamed file) only updates its own students
+                students, counts = np.unique(day_positions, return_counts=True)
+                present_counts = np.bincount(np.searchsorted(students, day_positions[day_present]),
+                                             minlength=len(students))
+            else:
+                students = slice(None)
+                counts = np.bincount(day_positions, minlength=len(self))
+                present_counts = np.bincount(day_positions[day_present], minlength=len(self))
+            slot = (self.as_of - age) % self.days
+            old_recorded, old_present = self.recorded[slot, students], self.present[slot, students]
+            recorded = np.minimum(old_recorded + counts, MAX_ROWS_PER_DAY)
+            present = np.minimum(old_present + present_counts, recorded)
+            for i, window in enumerate(self.windows):
+                if age < window:
+                    self.window_recorded[i, students] += recorded - old_recorded
+                    self.window_present[i, students] += present - old_present
+            self.recorded[slot, students], self.present[slot, students] = recorded, present
+
+    def append(self, positions, days, is_present, current_date=None):
+        """Advances to the newest of the rows' days on or before current_date (default today), then adds the rows."""
+        cap = day_number(current_date if current_date is not None else date.today())
+        due = days[(days <= cap) & (days != MISSING_DAY)]
+        if len(due):
+            self.advance(due.max())
+        self.add(positions, days, is_present)
+
+    def reset(self, positions):
+        """Forgets everything counted for the students at these positions."""
+        for name in RING_ARRAYS:
+            getattr(self, name)[:, positions] = 0
+
+    def reindex(self, student_ids):
+        """The ring with its columns in the order of student_ids; students it has not seen start empty."""
+        ring = AttendanceRing(student_ids, self.as_of, self.windows)
+        positions = pd.Index(self.student_ids).get_indexer(ring.student_ids)
+        found = positions >= 0
+        for name in RING_ARRAYS:
+            getattr(ring, name)[:, found] = getattr(self, name)[:, positions[found]]
+        return ring
+
+    def grow(self, student_ids):
+        """
+        Extends the ring to student_ids, whose first len(self) entries must be the current ones.
+        Capacity at least doubles when it runs out, so growing chunk by chunk copies little.
+        """
+        student_ids = np.asarray(student_ids)
+        n = len(student_ids)
+        if n > self._buffers['present'].shape[1]:
+            capacity = max(n, 2 * self._buffers['present'].shape[1])
+            for name in RING_ARRAYS:
+                array = getattr(self, name)
+                self._buffers[name] = np.zeros((array.shape[0], capacity), dtype=array.dtype)
+                self._buffers[name][:, :array.shape[1]] = array
+        for name in RING_ARRAYS:
+            setattr(self, name, self._buffers[name][:, :n])
+        self.student_ids = student_ids
+
+    def attendance(self):
+        """{column: attendance (in %) of every student over that window}; NaN without a row in the window."""
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return {column: np.where(recorded > 0, present / recorded * 100, np.nan)
+                    for column, present, recorded in zip(
+                        [f'rolling_attendance_{window}d' for window in self.windows],
+                        self.window_present, self.window_recorded)}
+
+    def save(self, path=ATTENDANCE_RING_PATH):
+        tmp_path = f'{path}.tmp-{os.getpid()}'
+        with open(tmp_path, 'wb') as f:
+            np.savez(f, student_ids=self.student_ids, windows=np.array(self.windows), as_of=np.int64(self.as_of),
+                     present=self.present, recorded=self.recorded, window_present=self.window_present,
+                     window_recorded=self.window_recorded)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path=ATTENDANCE_RING_PATH):
+        """The ring saved at path, or None if there is none (or it cannot be read)."""
+        try:
+            with np.load(path, allow_pickle=False) as saved:
+                ring = cls(saved['student_ids'], int(saved['as_of']), saved['windows'].tolist())
+                for name in RING_ARRAYS:
+                    setattr(ring, name, saved[name])
+                ring._buffers = {name: getattr(ring, name) for name in RING_ARRAYS}
+        except (OSError, KeyError, ValueError):
+            return None
+        return ring
+
+
+def build_attendance_ring(student_ids, attendance_df, as_of=None, current_date=None):
+    """
+    The ring of student_ids filled from an attendance frame, ending on as_of (a day number;
+    by default the latest attendance day on or before current_date).
+    """
+    ids, days, is_present = attendance_records(attendance_df)
+    ring = AttendanceRing(student_ids, latest_day(days, current_date) if as_of is None else as_of)
+    ring.add(pd.Index(ring.student_ids).get_indexer(ids), days, is_present)
+    return ring
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Write every student's 7/30/90-day attendance as of a chosen date.")
+    parser.add_argument('--as-of', help="Last day of the windows, YYYY-MM-DD (default: the latest attendance day).")
+    parser.add_argument('--output', default=WINDOWS_PATH, help="Where to write the attendance windows.")
+    args = parser.parse_args()
+
+    try:
+        current_date = pd.Timestamp(args.as_of) if args.as_of else None
+        students_df = read_input('students')
+        attendance_df = read_input('attendance')
+    except FileNotFoundError:
+        print("Error: students.csv / attendance.csv not found. Please run data_generator_v2.py first.")
+        sys.exit(1)
+    except ValueError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+
+    start = time.perf_counter()
+    ring = build_attendance_ring(students_df['student_id'].to_numpy(), attendance_df, current_date=current_date)
+    elapsed = time.perf_counter() - start
+    windows = pd.DataFrame({'student_id': ring.student_ids, **ring.attendance()})
+    windows.to_csv(args.output, index=False)
+    print(f"Attendance windows of {len(ring):,} students as of {day_string(ring.as_of)} "
+          f"({len(attendance_df):,} rows in {elapsed:.2f}s):")
+    print(windows[WINDOW_COLUMNS].describe().loc[['count', 'mean', 'min', '50%']].round(2).to_string())
+    print(f"\nWritten to '{args.output}'.")
@@ -0,0 +1,217 @@
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import time
+import tracemalloc
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+from plotly.utils import PlotlyJSONEncoder
+
+from data_generator_v2 import generate_vectorized
+
+# --- Configuration for the Benchmark Suite ---
+DEFAULT_SIZES = [1_000, 10_000, 100_000, 1_000_000]
+BENCHMARK_DATA_DIR = 'benchmark_data'
+RESULTS_PATH = 'benchmark_results.json'
+DAYS_OF_ATTENDANCE = 90
+STUDENTS_PER_MENTOR = 20
+INPUT_FILES = ['students.csv', 'attendance.csv', 'assessments.csv', 'fees.csv', 'mentors.csv']
+
+
+# --- Synthetic Data ---
+def ensure_dataset(n_students, data_dir=BENCHMARK_DATA_DIR, days=DAYS_OF_ATTENDANCE, seed=0, regenerate=False):
+    """Returns the directory holding the cohort of n_students, generating it if needed."""
+    directory = os.path.join(data_dir, f'students_{n_students}')
+    if regenerate or not all(os.path.exists(os.path.join(directory, name)) for name in INPUT_FILES):
+        print(f"Generating {n_students:,} students ({days} days of attendance) in '{directory}'...")
+        with contextlib.redirect_stdout(io.StringIO()):
+            generate_vectorized(n_students, max(1, n_students // STUDENTS_PER_MENTOR), days, seed=seed,
+                                output_dir=directory)
+    return directory
+
+
+# --- Measurement ---
+def payload_bytes(value):
+    """Size of a callback return value as Dash would serialize it for the browser."""
+    return len(json.dumps(value, cls=PlotlyJSONEncoder).encode('utf-8'))
+
+
+def measure(fn, repeat=1, memory=True):
+    """
+    Runs fn `repeat` times untraced and keeps the best wall time, then once more under
+    tracemalloc for the peak memory it allocated. Returns (result, wall_s, peak_mb).
+    """
+    wall = float('inf')
+    for _ in range(repeat):
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            result = fn()
+            wall = min(wall, time.perf_counter() - start)
+    peak_mb = None
+    if memory:
+        tracemalloc.start()
+        try:
+            with contextlib.redirect_stdout(io.StringIO()):
+                fn()
+            peak_mb = tracemalloc.get_traced_memory()[1] / 2 ** 20
+        finally:
+            tracemalloc.stop()
+    return result, wall, peak_mb
+
+
+# --- Benchmarks ---
+def benchmark_pipeline(n_students, repeat=1, memory=True):
+    """Times each stage of the ledger pipeline, then the full entry points end to end."""
+    import app_mentor
+    import app_student
+    import process_mentor
+    import process_student
+    from ingest_schema import read_input
+    from ledger_builder import LEDGER_PATH, build_student_ledger, summarize_assessments, summarize_attendance
+    from ledger_store import COLUMNAR_LEDGER_PATH, write_columnar_ledger
+    from risk_calculator import score_ledger
+
+    results = []
+
+    def record(stage, fn, rows=None):
+        result, wall, peak_mb = measure(fn, repeat, memory)
+        results.append({'students': n_students, 'kind': 'pipeline', 'stage': stage, 'wall_s': round(wall, 4),
+                        'peak_mb': None if peak_mb is None else round(peak_mb, 2), 'payload_bytes': None,
+                        'rows': rows if rows is not None else len(result[0] if isinstance(result, tuple) else result)})
+        return result
+
+    inputs = {table: record(f'read_{table}', lambda table=table: read_input(table))
+              for table in ['students', 'attendance', 'assessments', 'fees']}
+    record('summarize_attendance', lambda: summarize_attendance(inputs['attendance']))
+    record('summarize_assessments', lambda: summarize_assessments(inputs['assessments'])[0])
+    ledger = record('build_student_ledger', lambda: build_student_ledger(
+        inputs['students'], inputs['attendance'], inputs['assessments'], inputs['fees']))
+    record('score_ledger', lambda: score_ledger(ledger))
+    record('write_ledger_csv', lambda: ledger.to_csv(LEDGER_PATH, index=False), rows=len(ledger))
+    record('write_columnar_ledger', lambda: write_columnar_ledger(ledger, COLUMNAR_LEDGER_PATH), rows=len(ledger))
+    del inputs
+
+    record('process_student.process_all_data', process_student.process_all_data, rows=len(ledger))
+    record('process_mentor.process_all_data', lambda: process_mentor.process_all_data()[0])
+    app_mentor.set_ledger(*record('app_mentor.run_data_pipeline', app_mentor.run_data_pipeline))
+    app_student.set_ledger(record('app_student.run_data_pipeline', app_student.run_data_pipeline))
+    return results
+
+
+def benchmark_callbacks(n_students, repeat=5, memory=True):
+    """Calls the Dash callbacks directly with the inputs a logged-in user would send."""
+    import app_mentor
+    import app_student
+
+    results = []
+
+    def record(stage, fn):
+        result, wall, peak_mb = measure(fn, repeat, memory)
+        results.append({'students': n_students, 'kind': 'callback', 'stage': stage, 'wall_s': round(wall, 6),
+                        'peak_mb': None if peak_mb is None else round(peak_mb, 2),
+                        'payload_bytes': payload_bytes(result), 'rows': None})
+        return result
+
+    # Busiest mentor, so the numbers reflect the worst case for a login
+    ledger, mentors = app_mentor.ledger_handle.state.student_ledger, app_mentor.ledger_handle.state.mentors
+    mentor_id = ledger['mentor_id'].value_counts().idxmax()
+    login_id = mentors.loc[mentors['mentor_id'] == mentor_id, 'login_id'].iloc[0]
+    branches = ledger.loc[ledger['mentor_id'] == mentor_id, 'branch'].unique()[:2].tolist()
+
+    def cold(fn, cache):
+        cache.clear()
+        return fn()
+
+    # Page renders run cold (the rendered pages are dropped first); the ':cached' rows repeat them from the cache
+    session_token, mentor_id, _, _ = record(
+        'app_mentor.login_callback', lambda: app_mentor.login_callback(1, login_id, 'password123', '/'))
+    for page in ['/overview', '/all-students']:
+        route = lambda page=page: app_mentor.route_callback(page, mentor_id, session_token)
+        record(f'app_mentor.route_callback:{page}', lambda: cold(route, app_mentor.rendered_pages))
+        record(f'app_mentor.route_callback:{page}:cached', route)
+    record('app_mentor.update_table',
+           lambda: app_mentor.update_table(branches, ['Red', 'Amber'], session_token))
+
+    # Server-side table queries: filtering and sorting run cold (the cached views are dropped first),
+    # a page change then slices the view the previous query left in the cache
+    sort_by = [{'column_id': 'risk_score', 'direction': 'desc'}]
+
+    record('app_mentor.update_students_table:filter',
+           lambda: cold(lambda: app_mentor.update_students_table(0, [], '{risk_score} >= 40', session_token),
+                        app_mentor.table_views))
+    record('app_mentor.update_students_table:sort',
+           lambda: cold(lambda: app_mentor.update_students_table(0, sort_by, '', session_token),
+                        app_mentor.table_views))
+    record('app_mentor.update_students_table:page',
+           lambda: app_mentor.update_students_table(1, sort_by, '', session_token))
+
+    student_ledger = app_student.ledger_handle.state.student_ledger
+    student_id = int(student_ledger['student_id'].iloc[len(student_ledger) // 2])
+    login = lambda: app_student.update_page(1, str(student_id), app_student.LOGIN_PASSWORD)
+    record('app_student.update_page', lambda: cold(login, app_student.student_pages))
+    record('app_student.update_page:cached', login)
+    # The same login rendered as a full layout, as before the dashboard was templated
+    student = app_student.get_student_record(student_id).iloc[0]
+    record('app_student.full_dashboard', lambda: app_student.serialize_layout(
+        app_student.get_dashboard_layout(app_student.get_dashboard_values(student))))
+    return results
+
+
+def run_benchmarks(sizes=DEFAULT_SIZES, data_dir=BENCHMARK_DATA_DIR, days=DAYS_OF_ATTENDANCE, seed=0,
+                   repeat=1, callback_repeat=5, memory=True, regenerate=False):
+    """Runs the pipeline and callback benchmarks for each cohort size and returns the results document."""
+    code_dir = os.path.dirname(os.path.abspath(__file__))
+    cwd = os.getcwd()
+    records = []
+    for n_students in sizes:
+        directory = os.path.abspath(ensure_dataset(n_students, data_dir, days, seed, regenerate))
+        os.chdir(directory)  # the entry points read and write their CSV files in the working directory
+        try:
+            print(f"Benchmarking {n_students:,} students...")
+            with contextlib.redirect_stdout(io.StringIO()):
+                import app_mentor  # noqa: F401 (the Dash apps build their ledger on first import)
+            records += benchmark_pipeline(n_students, repeat, memory)
+            records += benchmark_callbacks(n_students, callback_repeat, memory)
+        finally:
+            os.chdir(cwd)
+    return {
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'machine': {'python': platform.python_version(), 'platform': platform.platform(),
+                    'cpu_count': os.cpu_count(), 'pandas': pd.__version__, 'numpy': np.__version__},
+        'parameters': {'sizes': list(sizes), 'days': days, 'seed': seed, 'repeat': repeat,
+                       'callback_repeat': callback_repeat, 'code_dir': code_dir},
+        'results': records,
+    }
+
+
+def print_summary(document):
+    table = pd.DataFrame(document['results'])
+    table = table.pivot_table(index=['kind', 'stage'], columns='students', values='wall_s', sort=False)
+    print("\nWall time (s) by stage and cohort size:")
+    print(table.to_string(float_format=lambda x: f'{x:.6f}'))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the ledger pipeline and the Dash callbacks.")
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES, help="Cohort sizes (students).")
+    parser.add_argument('--days', type=int, default=DAYS_OF_ATTENDANCE, help="Days of attendance per student.")
+    parser.add_argument('--seed', type=int, default=0, help="Seed for the synthetic data.")
+    parser.add_argument('--repeat', type=int, default=1, help="Timed runs per pipeline stage (best is kept).")
+    parser.add_argument('--callback-repeat', type=int, default=5, help="Timed runs per callback (best is kept).")
+    parser.add_argument('--no-memory', action='store_true', help="Skip the traced run that measures peak memory.")
+    parser.add_argument('--data-dir', default=BENCHMARK_DATA_DIR, help="Where the synthetic cohorts are kept.")
+    parser.add_argument('--regenerate', action='store_true', help="Regenerate cohorts that already exist.")
+    parser.add_argument('--output', default=RESULTS_PATH, help="Where to write the JSON results.")
+    args = parser.parse_args()
+
+    document = run_benchmarks(args.sizes, args.data_dir, args.days, args.seed, args.repeat,
+                              args.callback_repeat, not args.no_memory, args.regenerate)
+    with open(args.output, 'w') as f:
+        json.dump(document, f, indent=2)
+    print_summary(document)
+    print(f"\nResults written to '{args.output}'.")
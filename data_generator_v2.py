@@ -1,3 +1,6 @@
+import argparse
+import os
+
 import pandas as pd
 import numpy as np
 from datetime import date, timedelta
@@ -13,138 +16,269 @@ DAYS_OF_ATTENDANCE = 90
 NUM_ASSESSMENTS_PER_SUBJECT = 3 # 3 tests per subject
 SUBJECTS = ['Mathematics-I', 'Physics', 'Programming']
 BRANCHES = ['Computer Science', 'Electrical', 'Mechanical', 'Civil', 'Electronics']
+NAME_POOL_SIZE = 5000 # Names drawn once from Faker and reused in --vectorized mode
+CHUNK_STUDENTS = 10_000 # Students generated and written per block in --vectorized mode
+DECLINING_SCORE_RANGE = (70, 30) # --vectorized: a declining student's first and last test start here...
+DECLINING_SCORE_WIDTH = 20 # ...and each test's scores span this many points
 
-# --- 1. Mentors Data ---
-mentor_ids = [1000 + i for i in range(NUM_MENTORS)]
-mentor_data = {
-    'mentor_id': mentor_ids,
-    'login_id': [f'mentor{i}' for i in range(NUM_MENTORS)],
-    'password': ['password123'] * NUM_MENTORS,
-    'name': [fake.name() for _ in range(NUM_MENTORS)]
-}
-mentors_df = pd.DataFrame(mentor_data)
-mentors_df.to_csv('mentors.csv', index=False)
-print("Generated mentors.csv")
-
-# --- 2. Students Data ---
-student_ids = [2000 + i for i in range(NUM_STUDENTS)]
-student_assignment = np.repeat(mentor_ids, NUM_STUDENTS // NUM_MENTORS)
-np.random.shuffle(student_assignment)
-
-students_data = {
-    'student_id': student_ids,
-    'name': [fake.name() for _ in range(NUM_STUDENTS)],
-    'branch': np.random.choice(BRANCHES, NUM_STUDENTS),
-    'guardian_contact': [f'987654{i:04d}' for i in range(NUM_STUDENTS)],
-    'mentor_id': student_assignment
-}
-students_df = pd.DataFrame(students_data)
-students_df.to_csv('students.csv', index=False)
-print("Generated students.csv")
-
-# --- 3. Attendance Data ---
-attendance_records = []
-dates = [date.today() - timedelta(days=i) for i in range(DAYS_OF_ATTENDANCE)]
-for student_id in student_ids:
-    # Simulate a few students (10%) with attendance issues
-    if np.random.rand() < 0.1:
-        statuses = np.random.choice(['Present', 'Absent', 'Late'], p=[0.75, 0.2, 0.05], size=DAYS_OF_ATTENDANCE)
-    else:
-        statuses = np.random.choice(['Present', 'Absent', 'Late'], p=[0.95, 0.04, 0.01], size=DAYS_OF_ATTENDANCE)
 
-    for i, d in enumerate(dates):
-        attendance_records.append([student_id, d, statuses[i]])
+def generate_in_memory(num_students=NUM_STUDENTS, num_mentors=NUM_MENTORS, days=DAYS_OF_ATTENDANCE,
+                       subjects=SUBJECTS, seed=None):
+    """Original row-by-row generator: builds every table in memory and also derives student_ledger.csv."""
+    if seed is not None:
+        np.random.seed(seed)
+        fake.seed_instance(seed)
+
+    # --- 1. Mentors Data ---
+    mentor_ids = [1000 + i for i in range(num_mentors)]
+    mentor_data = {
+        'mentor_id': mentor_ids,
+        'login_id': [f'mentor{i}' for i in range(num_mentors)],
+        'password': ['password123'] * num_mentors,
+        'name': [fake.name() for _ in range(num_mentors)]
+    }
+    mentors_df = pd.DataFrame(mentor_data)
+    mentors_df.to_csv('mentors.csv', index=False)
+    print("Generated mentors.csv")
 
-attendance_df = pd.DataFrame(attendance_records, columns=['student_id', 'date', 'status'])
-attendance_df.to_csv('attendance.csv', index=False)
-print("Generated attendance.csv")
+    # --- 2. Students Data ---
+    student_ids = [2000 + i for i in range(num_students)]
+    student_assignment = np.repeat(mentor_ids, num_students // num_mentors)
+    np.random.shuffle(student_assignment)
 
-# --- 4. Assessments Data ---
-assessments_records = []
-for student_id in student_ids:
-    for subject in SUBJECTS:
-        # 10% of students have poor performance
+    students_data = {
+        'student_id': student_ids,
+        'name': [fake.name() for _ in range(num_students)],
+        'branch': np.random.choice(BRANCHES, num_students),
+        'guardian_contact': [f'987654{i:04d}' for i in range(num_students)],
+        'mentor_id': student_assignment
+    }
+    students_df = pd.DataFrame(students_data)
+    students_df.to_csv('students.csv', index=False)
+    print("Generated students.csv")
+
+    # --- 3. Attendance Data ---
+    attendance_records = []
+    dates = [date.today() - timedelta(days=i) for i in range(days)]
+    for student_id in student_ids:
+        # Simulate a few students (10%) with attendance issues
         if np.random.rand() < 0.1:
-            scores = np.random.uniform(20, 50, NUM_ASSESSMENTS_PER_SUBJECT)
-        # 5% of students have declining scores
-        elif np.random.rand() < 0.05:
-            scores = np.random.uniform(70, 90, 1).tolist() + np.random.uniform(55, 75, 1).tolist() + np.random.uniform(30, 50, 1).tolist()
+            statuses = np.random.choice(['Present', 'Absent', 'Late'], p=[0.75, 0.2, 0.05], size=days)
         else:
-            scores = np.random.uniform(60, 95, NUM_ASSESSMENTS_PER_SUBJECT)
-
-        for i in range(NUM_ASSESSMENTS_PER_SUBJECT):
-            assessments_records.append([
-                student_id,
-                f'{subject.split("-")[0].strip()}_{i+1}',
-                date.today() - timedelta(days=np.random.randint(1, 90)),
-                subject,
-                round(scores[i], 2),
-                100,
-                i+1
-            ])
-
-assessments_df = pd.DataFrame(assessments_records, columns=['student_id', 'assessment_id', 'date', 'subject', 'score', 'max_score', 'attempts'])
-assessments_df.to_csv('assessments.csv', index=False)
-print("Generated assessments.csv")
-
-# --- 5. Fees Data ---
-fees_records = []
-for student_id in student_ids:
-    amount_due = 150000 # Example annual fee
-    status = 'Paid'
-    amount_paid = amount_due
-    due_date = date.today() - timedelta(days=np.random.randint(1, 60))
-    last_payment_date = due_date
-
-    # Simulate 7% of students with overdue fees
-    if np.random.rand() < 0.07:
-        status = np.random.choice(['Overdue', 'Partial'])
-        amount_paid = np.random.randint(10000, amount_due - 10000) if status == 'Partial' else 0
-        due_date = date.today() - timedelta(days=np.random.randint(31, 180))
-        last_payment_date = pd.NaT
-
-    fees_records.append([student_id, due_date, amount_due, amount_paid, status, last_payment_date])
-
-fees_df = pd.DataFrame(fees_records, columns=['student_id', 'due_date', 'amount_due', 'amount_paid', 'status', 'last_payment_date'])
-fees_df.to_csv('fees.csv', index=False)
-print("Generated fees.csv")
-
-# --- 6. Create Student Ledger (Derived) ---
-# Start with students data
-student_ledger_df = students_df.copy()
-
-# Add a derived attendance percentage
-attendance_summary = attendance_df.groupby('student_id')['status'].apply(
-    lambda x: (x == 'Present').sum() / len(x) * 100 if len(x) > 0 else 0
-).reset_index(name='rolling_attendance_90d')
-student_ledger_df = student_ledger_df.merge(attendance_summary, on='student_id', how='left')
-
-# Add derived test score averages and attempts per subject
-assessments_summary = assessments_df.groupby(['student_id', 'subject']).agg(
-    avg_subject_score=('score', 'mean'),
-    attempts=('attempts', 'max')
-).reset_index()
-
-# Pivot to have subjects as columns
-assessments_summary_pivot = assessments_summary.pivot(index='student_id', columns='subject', values='avg_subject_score').reset_index()
-assessments_summary_pivot.columns = [f'avg_score_{col}' for col in assessments_summary_pivot.columns]
-assessments_summary_pivot = assessments_summary_pivot.rename(columns={'avg_score_student_id': 'student_id'})
-student_ledger_df = student_ledger_df.merge(assessments_summary_pivot, on='student_id', how='left')
-
-# Calculate overall average test score
-overall_avg_scores = assessments_df.groupby('student_id')['score'].mean().reset_index(name='overall_avg_score')
-student_ledger_df = student_ledger_df.merge(overall_avg_scores, on='student_id', how='left')
-
-# Add fee status info
-# Fix 1: Convert 'due_date' column to datetime objects
-fees_df['due_date'] = pd.to_datetime(fees_df['due_date'])
-# Fix 2: Convert date.today() to a Pandas Timestamp object for calculation
-current_date = pd.to_datetime(date.today())
-
-fees_df['overdue_days'] = (current_date - fees_df['due_date']).dt.days.fillna(0).astype(int)
-fees_summary = fees_df[['student_id', 'amount_due', 'amount_paid', 'status', 'overdue_days']]
-student_ledger_df = student_ledger_df.merge(fees_summary, on='student_id', how='left')
-
-# Save the final ledger
-student_ledger_df.to_csv('student_ledger.csv', index=False)
-print("Generated student_ledger.csv")
\ No newline at end of file
+            statuses = np.random.choice(['Present', 'Absent', 'Late'], p=[0.95, 0.04, 0.01], size=days)
+
+        for i, d in enumerate(dates):
+            attendance_records.append([student_id, d, statuses[i]])
+
+    attendance_df = pd.DataFrame(attendance_records, columns=['student_id', 'date', 'status'])
+    attendance_df.to_csv('attendance.csv', index=False)
+    print("Generated attendance.csv")
+
+    # --- 4. Assessments Data ---
+    assessments_records = []
+    for student_id in student_ids:
+        for subject in subjects:
+            # 10% of students have poor performance
+            if np.random.rand() < 0.1:
+                scores = np.random.uniform(20, 50, NUM_ASSESSMENTS_PER_SUBJECT)
+            # 5% of students have declining scores
+            elif np.random.rand() < 0.05:
+                scores = np.random.uniform(70, 90, 1).tolist() + np.random.uniform(55, 75, 1).tolist() + np.random.uniform(30, 50, 1).tolist()
+            else:
+                scores = np.random.uniform(60, 95, NUM_ASSESSMENTS_PER_SUBJECT)
+
+            for i in range(NUM_ASSESSMENTS_PER_SUBJECT):
+                assessments_records.append([
+                    student_id,
+                    f'{subject.split("-")[0].strip()}_{i+1}',
+                    date.today() - timedelta(days=np.random.randint(1, 90)),
+                    subject,
+                    round(scores[i], 2),
+                    100,
+                    i+1
+                ])
+
+    assessments_df = pd.DataFrame(assessments_records, columns=['student_id', 'assessment_id', 'date', 'subject', 'score', 'max_score', 'attempts'])
+    assessments_df.to_csv('assessments.csv', index=False)
+    print("Generated assessments.csv")
+
+    # --- 5. Fees Data ---
+    fees_records = []
+    for student_id in student_ids:
+        amount_due = 150000 # Example annual fee
+        status = 'Paid'
+        amount_paid = amount_due
+        due_date = date.today() - timedelta(days=np.random.randint(1, 60))
+        last_payment_date = due_date
+
+        # Simulate 7% of students with overdue fees
+        if np.random.rand() < 0.07:
+            status = np.random.choice(['Overdue', 'Partial'])
+            amount_paid = np.random.randint(10000, amount_due - 10000) if status == 'Partial' else 0
+            due_date = date.today() - timedelta(days=np.random.randint(31, 180))
+            last_payment_date = pd.NaT
+
+        fees_records.append([student_id, due_date, amount_due, amount_paid, status, last_payment_date])
+
+    fees_df = pd.DataFrame(fees_records, columns=['student_id', 'due_date', 'amount_due', 'amount_paid', 'status', 'last_payment_date'])
+    fees_df.to_csv('fees.csv', index=False)
+    print("Generated fees.csv")
+
+    # --- 6. Create Student Ledger (Derived) ---
+    # Start with students data
+    student_ledger_df = students_df.copy()
+
+    # Add a derived attendance percentage
+    attendance_summary = attendance_df.groupby('student_id')['status'].apply(
+        lambda x: (x == 'Present').sum() / len(x) * 100 if len(x) > 0 else 0
+    ).reset_index(name='rolling_attendance_90d')
+    student_ledger_df = student_ledger_df.merge(attendance_summary, on='student_id', how='left')
+
+    # Add derived test score averages and attempts per subject
+    assessments_summary = assessments_df.groupby(['student_id', 'subject']).agg(
+        avg_subject_score=('score', 'mean'),
+        attempts=('attempts', 'max')
+    ).reset_index()
+
+    # Pivot to have subjects as columns
+    assessments_summary_pivot = assessments_summary.pivot(index='student_id', columns='subject', values='avg_subject_score').reset_index()
+    assessments_summary_pivot.columns = [f'avg_score_{col}' for col in assessments_summary_pivot.columns]
+    assessments_summary_pivot = assessments_summary_pivot.rename(columns={'avg_score_student_id': 'student_id'})
+    student_ledger_df = student_ledger_df.merge(assessments_summary_pivot, on='student_id', how='left')
+
+    # Calculate overall average test score
+    overall_avg_scores = assessments_df.groupby('student_id')['score'].mean().reset_index(name='overall_avg_score')
+    student_ledger_df = student_ledger_df.merge(overall_avg_scores, on='student_id', how='left')
+
+    # Add fee status info
+    # Fix 1: Convert 'due_date' column to datetime objects
+    fees_df['due_date'] = pd.to_datetime(fees_df['due_date'])
+    # Fix 2: Convert date.today() to a Pandas Timestamp object for calculation
+    current_date = pd.to_datetime(date.today())
+
+    fees_df['overdue_days'] = (current_date - fees_df['due_date']).dt.days.fillna(0).astype(int)
+    fees_summary = fees_df[['student_id', 'amount_due', 'amount_paid', 'status', 'overdue_days']]
+    student_ledger_df = student_ledger_df.merge(fees_summary, on='student_id', how='left')
+
+    # Save the final ledger
+    student_ledger_df.to_csv('student_ledger.csv', index=False)
+    print("Generated student_ledger.csv")
+
+
+def generate_vectorized(num_students=NUM_STUDENTS, num_mentors=NUM_MENTORS, days=DAYS_OF_ATTENDANCE,
+                        subjects=SUBJECTS, seed=None, output_dir='.', chunk_students=CHUNK_STUDENTS):
+    """
+    Large-cohort generator with the same tables and risk mix as generate_in_memory. Rows are
+    built as whole arrays for one block of students at a time and appended to the CSVs, and
+    names are drawn from a pool pre-sampled from Faker, so memory stays flat at any size.
+    The derived ledger is left to process_mentor.py.
+    """
+    rng = np.random.default_rng(seed)
+    if seed is not None:
+        fake.seed_instance(seed)
+    os.makedirs(output_dir, exist_ok=True)
+    path = lambda name: os.path.join(output_dir, name)
+    name_pool = np.array([fake.name() for _ in range(min(NAME_POOL_SIZE, num_students + num_mentors))])
+
+    # --- 1. Mentors Data ---
+    mentor_ids = 1000 + np.arange(num_mentors)
+    pd.DataFrame({
+        'mentor_id': mentor_ids,
+        'login_id': [f'mentor{i}' for i in range(num_mentors)],
+        'password': 'password123',
+        'name': rng.choice(name_pool, num_mentors),
+    }).to_csv(path('mentors.csv'), index=False)
+    print("Generated mentors.csv")
+
+    today = pd.Timestamp(date.today())
+    dates = np.array([(date.today() - timedelta(days=i)).isoformat() for i in range(days)])
+    assessment_ids = [f'{subject.split("-")[0].strip()}_{i+1}' for subject in subjects
+                      for i in range(NUM_ASSESSMENTS_PER_SUBJECT)]
+    n_subjects, per_student = len(subjects), len(subjects) * NUM_ASSESSMENTS_PER_SUBJECT
+
+    for start in range(0, num_students, chunk_students):
+        n = min(chunk_students, num_students - start)
+        student_ids = 2000 + start + np.arange(n)
+        write = dict(index=False, header=start == 0, mode='w' if start == 0 else 'a')
+
+        # --- 2. Students Data (mentors assigned round-robin, shuffled within the block) ---
+        pd.DataFrame({
+            'student_id': student_ids,
+            'name': rng.choice(name_pool, n),
+            'branch': rng.choice(BRANCHES, n),
+            'guardian_contact': 9876540000 + student_ids - 2000,
+            'mentor_id': rng.permutation(mentor_ids[(start + np.arange(n)) % num_mentors]),
+        }).to_csv(path('students.csv'), **write)
+
+        # --- 3. Attendance Data (10% of students with attendance issues) ---
+        absent_p = np.where(rng.random(n) < 0.1, 0.2, 0.04)[:, None]
+        draws = rng.random((n, days))
+        statuses = np.where(draws < absent_p, 'Absent', np.where(draws < absent_p * 1.25, 'Late', 'Present'))
+        pd.DataFrame({
+            'student_id': np.repeat(student_ids, days),
+            'date': np.tile(dates, n),
+            'status': statuses.ravel(),
+        }).to_csv(path('attendance.csv'), **write)
+
+        # --- 4. Assessments Data (per student and subject: 10% poor, 5% of the rest declining) ---
+        profile = rng.random((n, n_subjects))
+        poor = profile < 0.1
+        declining = ~poor & (rng.random((n, n_subjects)) < 0.05)
+        shape = (n, n_subjects, NUM_ASSESSMENTS_PER_SUBJECT)
+        scores = rng.uniform(60, 95, shape)
+        scores = np.where(poor[..., None], rng.uniform(20, 50, shape), scores)
+        # Declining students' score ranges step down evenly from the first test to the last, however many there are
+        declining_low = np.linspace(*DECLINING_SCORE_RANGE, NUM_ASSESSMENTS_PER_SUBJECT)
+        declining_scores = rng.uniform(declining_low, declining_low + DECLINING_SCORE_WIDTH, shape)
+        scores = np.where(declining[..., None], declining_scores, scores)
+        pd.DataFrame({
+            'student_id': np.repeat(student_ids, per_student),
+            'assessment_id': np.tile(assessment_ids, n),
+            'date': (today - pd.to_timedelta(rng.integers(1, 90, n * per_student), unit='D')).strftime('%Y-%m-%d'),
+            'subject': np.tile(np.repeat(subjects, NUM_ASSESSMENTS_PER_SUBJECT), n),
+            'score': scores.ravel().round(2),
+            'max_score': 100,
+            'attempts': np.tile(np.arange(1, NUM_ASSESSMENTS_PER_SUBJECT + 1), n * n_subjects),
+        }).to_csv(path('assessments.csv'), **write)
+
+        # --- 5. Fees Data (7% of students overdue or partially paid) ---
+        amount_due = 150000
+        overdue = rng.random(n) < 0.07
+        partial = overdue & (rng.random(n) < 0.5)
+        due_days = np.where(overdue, rng.integers(31, 180, n), rng.integers(1, 60, n))
+        due_date = (today - pd.to_timedelta(due_days, unit='D')).strftime('%Y-%m-%d')
+        pd.DataFrame({
+            'student_id': student_ids,
+            'due_date': due_date,
+            'amount_due': amount_due,
+            'amount_paid': np.where(partial, rng.integers(10000, amount_due - 10000, n),
+                                    np.where(overdue, 0, amount_due)),
+            'status': np.where(partial, 'Partial', np.where(overdue, 'Overdue', 'Paid')),
+            'last_payment_date': np.where(overdue, '', due_date),
+        }).to_csv(path('fees.csv'), **write)
+
+        print(f"Generated {start + n:,} of {num_students:,} students")
+    print("Generated students.csv, attendance.csv, assessments.csv and fees.csv")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate the synthetic university CSV files.")
+    parser.add_argument('--students', type=int, default=NUM_STUDENTS, help="Number of students (default: %(default)s).")
+    parser.add_argument('--mentors', type=int, default=NUM_MENTORS, help="Number of mentors (default: %(default)s).")
+    parser.add_argument('--days', type=int, default=DAYS_OF_ATTENDANCE,
+                        help="Days of attendance per student (default: %(default)s).")
+    parser.add_argument('--subjects', nargs='+', default=SUBJECTS, help="Subject names (default: %(default)s).")
+    parser.add_argument('--seed', type=int, default=None, help="Random seed for reproducible output.")
+    parser.add_argument('--vectorized', action='store_true',
+                        help="Generate whole arrays per block of students and stream them to the CSVs "
+                             "(use for large cohorts; does not write student_ledger.csv).")
+    parser.add_argument('--chunk-students', type=int, default=CHUNK_STUDENTS,
+                        help="Students per block in --vectorized mode (default: %(default)s).")
+    parser.add_argument('--output-dir', default='.', help="Directory for the CSVs in --vectorized mode.")
+    args = parser.parse_args()
+
+    if args.vectorized:
+        generate_vectorized(args.students, args.mentors, args.days, args.subjects, args.seed,
+                            args.output_dir, args.chunk_students)
+    else:
+        generate_in_memory(args.students, args.mentors, args.days, args.subjects, args.seed)
@@ -0,0 +1,125 @@
+import importlib.util
+
+import pandas as pd
+
+# --- Input Schemas ---
+# Declared dtypes for every input CSV: categoricals for low-cardinality text, narrow integer IDs.
+# Scores stay float64: float32 would shift the score means (and band boundaries) in the ledger.
+INPUT_SCHEMAS = {
+    'students': {
+        'path': 'students.csv',
+        'dtype': {'student_id': 'int32', 'name': 'str', 'branch': 'category', 'guardian_contact': 'int64',
+                  'mentor_id': 'int32'},
+        'dates': [],
+    },
+    'attendance': {
+        'path': 'attendance.csv',
+        # Dates repeat for every student: read as categories, attendance_windows parses each distinct day once
+        'dtype': {'student_id': 'int32', 'date': 'category', 'status': 'category'},
+        'dates': [],
+    },
+    'assessments': {
+        'path': 'assessments.csv',
+        'dtype': {'student_id': 'int32', 'assessment_id': 'category', 'date': 'str', 'subject': 'category',
+                  'score': 'float64', 'max_score': 'int16', 'attempts': 'int8'},
+        'dates': ['date'],
+    },
+    'fees': {
+        'path': 'fees.csv',
+        'dtype': {'student_id': 'int32', 'due_date': 'str', 'amount_due': 'int32', 'amount_paid': 'int32',
+                  'status': 'category', 'last_payment_date': 'str'},
+        'dates': ['due_date', 'last_payment_date'],
+    },
+    'mentors': {
+        'path': 'mentors.csv',
+        'dtype': {'mentor_id': 'int32', 'login_id': 'str', 'password': 'str', 'name': 'str'},
+        'dates': [],
+    },
+}
+
+# Columns the ledger pipeline actually reads from each input (None = every declared column)
+LEDGER_INPUT_COLUMNS = {
+    'students': None,
+    'attendance': ['student_id', 'date', 'status'],
+    'assessments': ['student_id', 'subject', 'score', 'attempts'],
+    'fees': ['student_id', 'due_date', 'amount_due', 'amount_paid', 'status'],
+    'mentors': None,
+}
+
+
+def parser_engine(chunksize=None):
+    """pyarrow's multi-threaded CSV parser when it is installed (it cannot chunk), else the C parser."""
+    if chunksize is None and importlib.util.find_spec('pyarrow') is not None:
+        return 'pyarrow'
+    return 'c'
+
+
+def read_input(table, columns='ledger', path=None, chunksize=None):
+    """
+    Reads one input CSV with its declared dtypes, keeping only the requested columns and
+    parsing only the requested date columns. columns='ledger' reads what the ledger pipeline
+    needs; None reads every declared column. Falls back to type inference if the file does
+    not fit the schema (e.g. missing values in an integer column).
+    """
+    schema = INPUT_SCHEMAS[table]
+    if isinstance(columns, str):
+        columns = LEDGER_INPUT_COLUMNS[table]
+    if columns is None:
+        columns = list(schema['dtype'])
+    parse_dates = [column for column in schema['dates'] if column in columns]
+    dtype = {column: schema['dtype'][column] for column in columns if column not in parse_dates}
+    path = path or schema['path']
+
+    kwargs = {'usecols': columns, 'parse_dates': parse_dates or False, 'engine': parser_engine(chunksize)}
+    if chunksize is not None:
+        kwargs['chunksize'] = chunksize
+    try:
+        typed = pd.read_csv(path, dtype=dtype, **kwargs)
+    except (ValueError, TypeError) as e:
+        _schema_warning(path, e)
+        return pd.read_csv(path, **kwargs)
+    return typed if chunksize is None else _chunks_with_fallback(typed, path, kwargs)
+
+
+def _schema_warning(path, error):
+    print(f"Warning: '{path}' does not match the ingestion schema ({error}); using type inference instead.")
+
+
+def _chunks_with_fallback(typed, path, kwargs):
+    """
+    The chunks of a typed chunked reader. Chunks are only parsed while they are iterated, so a
+    chunk that does not fit the schema fails here rather than in read_input; the rest of the file
+    is then read with type inference, starting at the first row not yet handed out.
+    """
+    rows = 0
+    try:
+        with typed:
+            for chunk in typed:
+                rows += len(chunk)
+                yield chunk
+        return
+    except (ValueError, TypeError) as e:
+        _schema_warning(path, e)
+    with pd.read_csv(path, skiprows=range(1, rows + 1), **kwargs) as inferred:
+        yield from inferred
+
+
+# --- Memory Report ---
+def bytes_per_row(df):
+    return df.memory_usage(deep=True, index=False).sum() / max(len(df), 1)
+
+
+def memory_report(tables=('students', 'attendance', 'assessments', 'fees')):
+    """Bytes per row with plain pd.read_csv versus the typed, column-pruned ingestion schema."""
+    rows = []
+    for table in tables:
+        inferred = pd.read_csv(INPUT_SCHEMAS[table]['path'])
+        typed = read_input(table)
+        before, after = bytes_per_row(inferred), bytes_per_row(typed)
+        rows.append({'table': table, 'rows': len(inferred), 'bytes_per_row_before': round(before, 1),
+                     'bytes_per_row_after': round(after, 1), 'saving_pct': round(100 * (1 - after / before), 1)})
+    return pd.DataFrame(rows)
+
+
+if __name__ == "__main__":
+    print(memory_report().to_string(index=False))
@@ -0,0 +1,545 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date
+
+import numpy as np
+import pandas as pd
+
+from attendance_windows import (ATTENDANCE_RING_PATH, WINDOW_COLUMNS, AttendanceRing, attendance_days,
+                                attendance_records, build_attendance_ring, day_string, latest_day)
+from ingest_schema import read_input
+from pipeline_profiler import NULL_PROFILER
+from risk_calculator import get_scoring_plan, score_ledger
+
+# --- Configuration for Ledger Builds ---
+LEDGER_PATH = 'student_ledger.csv'
+FINGERPRINTS_PATH = 'ledger_fingerprints.csv'
+STREAM_CHUNK_ROWS = 250_000  # rows per chunk when streaming attendance/assessments
+DENSE_ID_MAX_SPREAD = 4  # direct ID lookup while max-min+1 is at most this many times the student count
+INPUT_TABLES = ['students', 'attendance', 'assessments', 'fees']
+RISK_COLUMNS = ['risk_score', 'risk_reasons', 'risk_band']
+# Columns a full build writes as integers whenever they contain no missing values
+INTEGER_COLUMNS = ['student_id', 'guardian_contact', 'mentor_id', 'max_attempts_overall', 'amount_due',
+                   'amount_paid', 'overdue_days', 'risk_score']
+
+
+# --- Full Build ---
+def summarize_attendance(attendance_df, as_of=None, current_date=None):
+    """
+    Attendance ratio (in %) per student over each window, ending on the as_of day (by default
+    the latest attendance day on or before current_date).
+    """
+    student_ids = np.sort(attendance_df['student_id'].dropna().unique())
+    ring = build_attendance_ring(student_ids, attendance_df, as_of=as_of, current_date=current_date)
+    return pd.DataFrame({'student_id': student_ids, **ring.attendance()})
+
+
+def summarize_assessments(assessments_df):
+    """Overall score mean and max attempts per student, plus per-subject score means."""
+    assessments_summary = assessments_df.groupby('student_id').agg(
+        overall_avg_score=('score', 'mean'),
+        max_attempts_overall=('attempts', 'max')
+    ).reset_index()
+
+    # Per-subject scores
+    assessments_summary_pivot = assessments_df.groupby(['student_id', 'subject'], observed=True)[
+        'score'].mean().unstack().reset_index()
+    assessments_summary_pivot.columns = ['student_id'] + [f'avg_score_{col}' for col in
+                                                          assessments_summary_pivot.columns[1:]]
+    return assessments_summary, assessments_summary_pivot
+
+
+def fuse_student_ledger(students_df, attendance_summary, assessments_summary, assessments_summary_pivot, fees_df,
+                        band_labels=None, current_date=None, profiler=NULL_PROFILER):
+    """Merges the per-student summaries and fee rows onto the students and scores every row."""
+    if current_date is None:
+        current_date = pd.to_datetime(date.today())
+
+    # FUSE DATA & CALCULATE RISK
+    with profiler.stage('merge_summaries') as stage:
+        student_ledger = students_df.copy()
+        student_ledger = student_ledger.merge(attendance_summary, on='student_id', how='left')
+        student_ledger = student_ledger.merge(assessments_summary, on='student_id', how='left')
+        student_ledger = student_ledger.merge(assessments_summary_pivot, on='student_id', how='left')
+        stage['rows'] = len(student_ledger)
+
+    # Fees
+    with profiler.stage('merge_fees', rows=len(fees_df)):
+        fees_df = fees_df.copy()
+        fees_df['due_date'] = pd.to_datetime(fees_df['due_date'])
+        fees_df['overdue_days'] = (current_date - fees_df['due_date']).dt.days.fillna(0).astype(int)
+        fees_summary = fees_df[['student_id', 'amount_due', 'amount_paid', 'status', 'overdue_days']]
+        student_ledger = student_ledger.merge(fees_summary, on='student_id', how='left')
+
+    # Apply risk calculation
+    return profiler.run('score_ledger', score_ledger, student_ledger, band_labels=band_labels)
+
+
+def build_student_ledger(students_df, attendance_df, assessments_df, fees_df, band_labels=None,
+                         current_date=None, attendance_as_of=None, profiler=NULL_PROFILER):
+    """
+    Fuses the raw input frames into one row per student and scores every row. The attendance
+    windows end on attendance_as_of (a day number; by default the latest attendance day on or
+    before current_date).
+    """
+    if current_date is None:
+        current_date = pd.to_datetime(date.today())
+    if _dense_build_applies(students_df, fees_df):
+        return build_student_ledger_dense(students_df, attendance_df, assessments_df, fees_df,
+                                          band_labels=band_labels, current_date=current_date,
+                                          attendance_as_of=attendance_as_of, profiler=profiler)
+
+    # Duplicate students or fee rows fan out into several ledger rows, which only the merges reproduce
+    with profiler.stage('summarize_attendance', rows=len(attendance_df)):
+        attendance_summary = summarize_attendance(attendance_df, as_of=attendance_as_of, current_date=current_date)
+    with profiler.stage('summarize_assessments', rows=len(assessments_df)):
+        assessments_summary, assessments_summary_pivot = summarize_assessments(assessments_df)
+    return fuse_student_ledger(students_df, attendance_summary, assessments_summary, assessments_summary_pivot,
+                               fees_df, band_labels=band_labels, current_date=current_date, profiler=profiler)
+
+
+# --- Streaming Build (bounded memory) ---
+class _KeySlots:
+    """Assigns a stable array slot to every key seen so far in a stream."""
+
+    def __init__(self):
+        self.keys = pd.Index([])
+
+    def __len__(self):
+        return len(self.keys)
+
+    def slots(self, values):
+        unseen = pd.Index(pd.unique(values)).difference(self.keys, sort=False)
+        if len(unseen):
+            self.keys = self.keys.append(unseen)
+        return self.keys.get_indexer(values)
+
+
+def _grow(array, shape, fill):
+    """Returns array padded with fill up to shape (1-D or 2-D)."""
+    if array.shape == tuple(shape):
+        return array
+    grown = np.full(shape, fill, dtype=array.dtype)
+    grown[tuple(slice(0, n) for n in array.shape)] = array
+    return grown
+
+
+def _kahan_add(sums, compensations, counts, slots, values):
+    """
+    Adds values into sums[slots] using the same compensated (Kahan) summation and row order
+    as pandas' groupby mean, so the streamed means are bit-identical to the in-memory ones.
+    """
+    keep = ~np.isnan(values)
+    slots, values = slots[keep], values[keep]
+    if not len(slots):
+        return
+    # Process each key's rows in file order: the k-th occurrence of every key forms one batch
+    occurrence = pd.Series(slots).groupby(slots).cumcount().to_numpy()
+    order = np.argsort(occurrence, kind='stable')
+    bounds = np.searchsorted(occurrence[order], np.arange(occurrence.max() + 2))
+    for start, stop in zip(bounds[:-1], bounds[1:]):
+        batch = order[start:stop]
+        s, v = slots[batch], values[batch]
+        y = v - compensations[s]
+        t = sums[s] + y
+        compensations[s] = (t - sums[s]) - y
+        sums[s] = t
+        counts[s] += 1
+
+
+def summarize_inputs_streaming(attendance_path='attendance.csv', assessments_path='assessments.csv',
+                               chunksize=STREAM_CHUNK_ROWS, current_date=None):
+    """
+    Reads attendance and assessments in chunks and keeps only running per-student counters
+    (day ring, score sum/count, max attempts), so peak memory depends on the number of
+    students, not on the number of rows. Returns the same three summaries as the in-memory path.
+    """
+    # Attendance: a day ring per student, moved forward to the newest day each chunk brings
+    students = _KeySlots()
+    ring = AttendanceRing([])
+    for chunk in read_input('attendance', path=attendance_path, chunksize=chunksize):
+        chunk = chunk[chunk['student_id'].notna()]
+        slots = students.slots(chunk['student_id'].to_numpy())
+        ring.grow(students.keys.to_numpy())
+        _, days, is_present = attendance_records(chunk)
+        ring.append(slots, days, is_present, current_date)
+    order = np.argsort(students.keys.to_numpy(), kind='stable')
+    attendance_summary = pd.DataFrame({
+        'student_id': students.keys.to_numpy()[order],
+        **{column: values[order] for column, values in ring.attendance().items()},
+    })
+
+    # Assessments: overall and per-subject score means, max attempts
+    students, subjects = _KeySlots(), _KeySlots()
+    score_sum, score_comp, score_count = np.zeros(0), np.zeros(0), np.zeros(0, dtype=np.int64)
+    max_attempts = np.zeros(0)
+    subject_sum, subject_comp = np.zeros((0, 0)), np.zeros((0, 0))
+    subject_count, subject_rows = np.zeros((0, 0), dtype=np.int64), np.zeros((0, 0), dtype=bool)
+    attempts_dtype = None
+    for chunk in read_input('assessments', path=assessments_path, chunksize=chunksize):
+        chunk = chunk[chunk['student_id'].notna()]
+        attempts_dtype = chunk['attempts'].dtype if attempts_dtype is None else \
+            np.promote_types(attempts_dtype, chunk['attempts'].dtype)
+        slots = students.slots(chunk['student_id'].to_numpy())
+        n = len(students)
+        score_sum, score_comp = _grow(score_sum, (n,), 0.0), _grow(score_comp, (n,), 0.0)
+        score_count, max_attempts = _grow(score_count, (n,), 0), _grow(max_attempts, (n,), np.nan)
+        scores = chunk['score'].to_numpy(dtype=float)
+        _kahan_add(score_sum, score_comp, score_count, slots, scores)
+        attempts = chunk['attempts'].to_numpy(dtype=float)
+        np.fmax.at(max_attempts, slots, attempts)
+
+        has_subject = chunk['subject'].notna().to_numpy()
+        subject_slots = subjects.slots(chunk['subject'].to_numpy()[has_subject])
+        shape = (n, len(subjects))
+        subject_sum, subject_comp = _grow(subject_sum, shape, 0.0), _grow(subject_comp, shape, 0.0)
+        subject_count, subject_rows = _grow(subject_count, shape, 0), _grow(subject_rows, shape, False)
+        subject_rows[slots[has_subject], subject_slots] = True
+        flat = np.ravel_multi_index((slots[has_subject], subject_slots), shape)
+        _kahan_add(subject_sum.reshape(-1), subject_comp.reshape(-1), subject_count.reshape(-1), flat,
+                   scores[has_subject])
+
+    order = np.argsort(students.keys.to_numpy(), kind='stable')
+    with np.errstate(invalid='ignore', divide='ignore'):
+        overall_avg_score = np.where(score_count > 0, score_sum / score_count, np.nan)
+        subject_avg = np.where(subject_count > 0, subject_sum / np.maximum(subject_count, 1), np.nan)
+    max_attempts_overall = pd.Series(max_attempts[order])
+    if attempts_dtype is not None and max_attempts_overall.notna().all():
+        max_attempts_overall = max_attempts_overall.astype(attempts_dtype)
+    assessments_summary = pd.DataFrame({
+        'student_id': students.keys.to_numpy()[order],
+        'overall_avg_score': overall_avg_score[order],
+        'max_attempts_overall': max_attempts_overall,
+    })
+
+    # Per-subject scores: only students with at least one subject row, subjects in sorted order
+    subject_order = np.argsort(subjects.keys.to_numpy(), kind='stable')
+    rows = order[subject_rows[order].any(axis=1)] if len(subjects) else np.zeros(0, dtype=np.int64)
+    assessments_summary_pivot = pd.DataFrame({'student_id': students.keys.to_numpy()[rows]})
+    for j in subject_order:
+        assessments_summary_pivot[f'avg_score_{subjects.keys[j]}'] = subject_avg[rows, j]
+    return attendance_summary, assessments_summary, assessments_summary_pivot
+
+
+def build_student_ledger_streaming(students_df, fees_df, attendance_path='attendance.csv',
+                                   assessments_path='assessments.csv', chunksize=STREAM_CHUNK_ROWS,
+                                   band_labels=None, current_date=None, profiler=NULL_PROFILER):
+    """Same ledger as build_student_ledger, aggregating attendance and assessments chunk by chunk."""
+    with profiler.stage('stream_attendance_assessments') as stage:
+        attendance_summary, assessments_summary, assessments_summary_pivot = summarize_inputs_streaming(
+            attendance_path, assessments_path, chunksize=chunksize, current_date=current_date)
+        stage['rows'] = len(attendance_summary)
+    return fuse_student_ledger(students_df, attendance_summary, assessments_summary, assessments_summary_pivot,
+                               fees_df, band_labels=band_labels, current_date=current_date, profiler=profiler)
+
+
+# --- Dense Build (ID-indexed scatter instead of chained merges) ---
+def _dense_build_applies(students_df, fees_df):
+    """The scatter path needs one row per student and per fee record and no clashing column names."""
+    derived = {*WINDOW_COLUMNS, 'overall_avg_score', 'max_attempts_overall', 'amount_due', 'amount_paid',
+               'status', 'overdue_days'}
+    return (not students_df['student_id'].duplicated().any() and not fees_df['student_id'].duplicated().any()
+            and not derived & set(students_df.columns)
+            and not any(str(c).startswith('avg_score_') for c in students_df.columns))
+
+
+def student_positions(student_ids, keys):
+    """
+    Maps every key to the row position of that student in student_ids (-1 if absent). Compact
+    integer IDs go through a direct lookup table; sparse or non-integer IDs through a hash index.
+    """
+    student_ids, keys = np.asarray(student_ids), np.asarray(keys)
+    if len(student_ids) and student_ids.dtype.kind in 'iu' and keys.dtype.kind in 'iu':
+        low, high = int(student_ids.min()), int(student_ids.max())
+        if high - low + 1 <= DENSE_ID_MAX_SPREAD * len(student_ids):
+            lookup = np.full(high - low + 1, -1, dtype=np.int64)
+            lookup[student_ids - low] = np.arange(len(student_ids))
+            positions = np.full(len(keys), -1, dtype=np.int64)
+            inside = (keys >= low) & (keys <= high)
+            positions[inside] = lookup[keys[inside] - low]
+            return positions
+    return pd.Index(student_ids).get_indexer(keys)
+
+
+def _scatter(values, positions, n_rows):
+    """Places values[j] at ledger row positions[j]; rows without a value get NaN, as a left merge would."""
+    take = np.full(n_rows, -1, dtype=np.int64)
+    matched = positions >= 0
+    take[positions[matched]] = np.flatnonzero(matched)
+    return values.reset_index(drop=True).reindex(take).to_numpy() if n_rows else values.iloc[:0].to_numpy()
+
+
+def build_student_ledger_dense(students_df, attendance_df, assessments_df, fees_df, band_labels=None,
+                               current_date=None, attendance_as_of=None, profiler=NULL_PROFILER):
+    """
+    Same ledger as the merge-based build: maps student_id to a dense row position once and
+    scatters every summary straight into preallocated per-student columns.
+    """
+    if current_date is None:
+        current_date = pd.to_datetime(date.today())
+
+    student_ledger = students_df.reset_index(drop=True)
+    n_rows = len(student_ledger)
+    student_ids = student_ledger['student_id'].to_numpy()
+
+    # Attendance
+    with profiler.stage('aggregate_attendance', rows=len(attendance_df)):
+        keys, days, is_present = attendance_records(attendance_df)
+        ring = AttendanceRing(student_ids, latest_day(days, current_date) if attendance_as_of is None
+                              else attendance_as_of)
+        ring.add(student_positions(student_ids, keys), days, is_present)
+        for column, values in ring.attendance().items():
+            student_ledger[column] = values
+
+    # Assessments
+    with profiler.stage('aggregate_assessments', rows=len(assessments_df)):
+        positions = student_positions(student_ids, assessments_df['student_id'].to_numpy())
+        matched = positions >= 0
+        rows = positions[matched]
+        scores = assessments_df['score'].to_numpy(dtype=float)[matched]
+        score_sum, score_comp, score_count = np.zeros(n_rows), np.zeros(n_rows), np.zeros(n_rows, dtype=np.int64)
+        _kahan_add(score_sum, score_comp, score_count, rows, scores)
+        max_attempts = np.full(n_rows, np.nan)
+        np.fmax.at(max_attempts, rows, assessments_df['attempts'].to_numpy(dtype=float)[matched])
+        with np.errstate(invalid='ignore', divide='ignore'):
+            student_ledger['overall_avg_score'] = np.where(score_count > 0, score_sum / score_count, np.nan)
+        attempts_dtype = assessments_df['attempts'].dtype
+        if attempts_dtype.kind in 'iu' and not np.isnan(max_attempts).any():
+            student_ledger['max_attempts_overall'] = max_attempts.astype(attempts_dtype)
+        else:
+            student_ledger['max_attempts_overall'] = max_attempts
+
+        # Per-subject scores (one column per subject seen anywhere in assessments.csv, as the pivot does)
+        has_key = assessments_df['student_id'].notna().to_numpy() & assessments_df['subject'].notna().to_numpy()
+        subjects = np.sort(pd.unique(assessments_df['subject'].to_numpy()[has_key]))
+        has_subject = assessments_df['subject'].notna().to_numpy()[matched]
+        subject_codes = np.searchsorted(subjects, assessments_df['subject'].to_numpy()[matched][has_subject])
+        shape = (n_rows, len(subjects))
+        subject_sum, subject_comp = np.zeros(shape), np.zeros(shape)
+        subject_count = np.zeros(shape, dtype=np.int64)
+        if len(subjects):
+            flat = np.ravel_multi_index((rows[has_subject], subject_codes), shape)
+            _kahan_add(subject_sum.reshape(-1), subject_comp.reshape(-1), subject_count.reshape(-1), flat,
+                       scores[has_subject])
+        with np.errstate(invalid='ignore', divide='ignore'):
+            subject_avg = np.where(subject_count > 0, subject_sum / np.maximum(subject_count, 1), np.nan)
+        for j, subject in enumerate(subjects):
+            student_ledger[f'avg_score_{subject}'] = subject_avg[:, j]
+
+    # Fees
+    with profiler.stage('scatter_fees', rows=len(fees_df)):
+        positions = student_positions(student_ids, fees_df['student_id'].to_numpy())
+        due_dates = pd.to_datetime(fees_df['due_date'])
+        overdue_days = (current_date - due_dates).dt.days.fillna(0).astype(int)
+        for column, values in [('amount_due', fees_df['amount_due']), ('amount_paid', fees_df['amount_paid']),
+                               ('status', fees_df['status']), ('overdue_days', overdue_days)]:
+            student_ledger[column] = _scatter(values, positions, n_rows)
+
+    # Apply risk calculation
+    return profiler.run('score_ledger', score_ledger, student_ledger, band_labels=band_labels)
+
+
+# --- Sharded Build (multi-core) ---
+def _build_shard(shard):
+    """Process-pool worker: builds and scores the ledger rows of one shard of students."""
+    students_df, attendance_df, assessments_df, fees_df, band_labels, current_date, attendance_as_of = shard
+    return build_student_ledger(students_df, attendance_df, assessments_df, fees_df,
+                                band_labels=band_labels, current_date=current_date, attendance_as_of=attendance_as_of)
+
+
+def build_student_ledger_parallel(students_df, attendance_df, assessments_df, fees_df, workers=None,
+                                  band_labels=None, current_date=None):
+    """
+    Splits the students into contiguous blocks, builds each block's ledger in a process pool
+    and concatenates the blocks in order. The result is identical to build_student_ledger.
+    """
+    workers = workers or os.cpu_count() or 1
+    if current_date is None:
+        current_date = pd.to_datetime(date.today())
+    if workers == 1 or len(students_df) < 2:
+        return build_student_ledger(students_df, attendance_df, assessments_df, fees_df,
+                                    band_labels=band_labels, current_date=current_date)
+
+    # Every shard's attendance windows end on the same day, whichever days its own students have
+    attendance_as_of = latest_day(attendance_days(attendance_df['date']), current_date)
+
+    # Every input row follows its student into that student's shard
+    shard_ids = np.array_split(np.arange(len(students_df)), min(workers, len(students_df)))
+    shard_of = pd.Series(np.repeat(np.arange(len(shard_ids)), [len(ids) for ids in shard_ids]),
+                         index=students_df['student_id'].to_numpy())
+    shard_of = shard_of[~shard_of.index.duplicated()]
+    grouped = [dict(iter(df.groupby(df['student_id'].map(shard_of))))
+               for df in (attendance_df, assessments_df, fees_df)]
+    shards = []
+    for shard, ids in enumerate(shard_ids):
+        frames = [group.get(shard, df.iloc[:0]) for group, df in zip(grouped, (attendance_df, assessments_df, fees_df))]
+        shards.append((students_df.iloc[ids], *frames, band_labels, current_date, attendance_as_of))
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        shard_ledgers = list(executor.map(_build_shard, shards))
+
+    # Shards without a given subject lack its column; restore the full build's column layout
+    subject_columns = [f'avg_score_{subject}' for subject in sorted(assessments_df['subject'].dropna().unique())]
+    base_columns = [c for c in shard_ledgers[0].columns if not c.startswith('avg_score_')]
+    insert_at = base_columns.index('max_attempts_overall') + 1
+    columns = base_columns[:insert_at] + subject_columns + base_columns[insert_at:]
+    return pd.concat([ledger.reindex(columns=columns) for ledger in shard_ledgers], ignore_index=True)
+
+
+# --- Incremental Build (dirty students only) ---
+def _student_hashes(df):
+    """Sum of the row hashes of each student's rows; summing wraps modulo 2**64, so row order does not matter."""
+    row_hashes = pd.Series(pd.util.hash_pandas_object(df, index=False).to_numpy(), index=df['student_id'].to_numpy())
+    return row_hashes.groupby(level=0).sum()
+
+
+def fingerprint_inputs(students_df, attendance_df, assessments_df, fees_df):
+    """
+    Returns one order-independent hash per student for each input table. A student's
+    fingerprint only changes when one of their own input rows is added, edited or removed.
+    """
+    fingerprints = pd.DataFrame({'student_id': students_df['student_id'].unique()})
+    for table, df in zip(INPUT_TABLES, [students_df, attendance_df, assessments_df, fees_df]):
+        table_hashes = _student_hashes(df)
+        # reindex keeps the sums in uint64 (a map would go through float64 for students without rows)
+        fingerprints[table] = table_hashes.reindex(fingerprints['student_id'], fill_value=0).to_numpy(np.uint64)
+    return fingerprints
+
+
+def load_fingerprints(path=FINGERPRINTS_PATH):
+    """Reads the fingerprints saved by the previous run, or None if there are none."""
+    if not os.path.exists(path):
+        return None
+    dtype = {table: np.uint64 for table in INPUT_TABLES} | {'as_of': str, 'attendance_as_of': str, 'rules': str}
+    return pd.read_csv(path, dtype=dtype)
+
+
+def load_previous_ledger(path=LEDGER_PATH):
+    """Reads the ledger written by the previous run, or None if there is none."""
+    if not os.path.exists(path):
+        return None
+    # round_trip keeps the floats identical to what a full build would write back out
+    return pd.read_csv(path, float_precision='round_trip')
+
+
+def _restore_integer_columns(student_ledger):
+    """Casts integer columns back from float once patching has filled every gap."""
+    for column in INTEGER_COLUMNS:
+        if column in student_ledger.columns and student_ledger[column].dtype.kind == 'f':
+            values = student_ledger[column]
+            if values.notna().all() and (values == values.round()).all():
+                student_ledger[column] = values.astype(np.int64)
+    return student_ledger
+
+
+def update_student_ledger(students_df, attendance_df, assessments_df, fees_df, previous_ledger,
+                          previous_fingerprints, band_labels=None, current_date=None,
+                          ring_path=ATTENDANCE_RING_PATH):
+    """
+    Rebuilds only the ledger rows of students whose input rows changed since the previous
+    run and patches them into the previous ledger. Falls back to a full build when there is
+    no usable previous state. Returns the new ledger, its fingerprints and the dirty count.
+    Attendance windows come from the day ring the previous run saved at ring_path: attendance
+    rows for days after that run's are appended to it, so a new day of attendance moves every
+    student's windows without rebuilding any of them.
+    """
+    if current_date is None:
+        current_date = pd.to_datetime(date.today())
+    as_of = str(current_date.date())
+    rules = get_scoring_plan().digest
+    attendance_ids, days, is_present = attendance_records(attendance_df)
+    attendance_as_of = latest_day(days, current_date)
+
+    fingerprints = fingerprint_inputs(students_df, attendance_df, assessments_df, fees_df)
+    fingerprints['as_of'] = as_of
+    fingerprints['attendance_as_of'] = day_string(attendance_as_of)
+    fingerprints['rules'] = rules
+    student_ids = fingerprints['student_id'].to_numpy()
+    positions = student_positions(student_ids, attendance_ids)
+
+    def full_build():
+        ledger = build_student_ledger(students_df, attendance_df, assessments_df, fees_df, band_labels=band_labels,
+                                      current_date=current_date, attendance_as_of=attendance_as_of)
+        ring = AttendanceRing(student_ids, attendance_as_of)
+        ring.add(positions, days, is_present)
+        ring.save(ring_path)
+        return ledger, fingerprints, len(fingerprints)
+
+    # Patching keys rows by student_id, so it needs exactly one students/fees row per student
+    if (previous_ledger is None or previous_fingerprints is None
+            or students_df['student_id'].duplicated().any() or fees_df['student_id'].duplicated().any()
+            or previous_ledger['student_id'].duplicated().any()
+            or not set(WINDOW_COLUMNS) <= set(previous_ledger.columns)):
+        return full_build()
+
+    previous = previous_fingerprints.set_index('student_id')[INPUT_TABLES]
+    current = fingerprints.set_index('student_id')[INPUT_TABLES]
+    known = current.index.isin(previous.index) & current.index.isin(previous_ledger['student_id'])
+    changed_tables = current[known] != previous.loc[current.index[known]]
+    changed = np.ones(len(current), dtype=bool)
+    changed[known] = changed_tables.any(axis=1).to_numpy()
+
+    # The previous ring is only good for the attendance it was saved with
+    ring = AttendanceRing.load(ring_path)
+    previous_attendance_as_of = None
+    if len(previous_fingerprints) and 'attendance_as_of' in previous_fingerprints:
+        previous_attendance_as_of = previous_fingerprints['attendance_as_of'].iloc[0]
+    if ring is not None and day_string(ring.as_of) == previous_attendance_as_of and ring.as_of <= attendance_as_of:
+        # A student whose attendance hash grew by exactly the hashes of their rows for new days
+        # only had days appended; their other rows are untouched and need no rebuild
+        new_days = days > ring.as_of
+        appended = _student_hashes(attendance_df[new_days]).reindex(current.index[known], fill_value=0)
+        append_only = (previous.loc[current.index[known], 'attendance'].to_numpy(np.uint64)
+                       + appended.to_numpy(np.uint64) == current.loc[known, 'attendance'].to_numpy(np.uint64))
+        changed[known] = (changed_tables.drop(columns='attendance').any(axis=1).to_numpy()
+                          | (changed_tables['attendance'].to_numpy() & ~append_only))
+        ring = ring.reindex(student_ids)
+        ring.advance(attendance_as_of)
+    else:
+        ring = AttendanceRing(student_ids, attendance_as_of)
+        new_days = np.ones(len(days), dtype=bool)
+    dirty_ids = current.index[changed]
+
+    # Dirty students are recounted from all their rows, everyone else gets the new days' rows
+    ring.reset(np.flatnonzero(changed))
+    take = (positions >= 0) & (new_days | changed[np.maximum(positions, 0)])
+    ring.add(positions[take], days[take], is_present[take])
+
+    dirty_ledger = build_student_ledger(
+        students_df[students_df['student_id'].isin(dirty_ids)],
+        attendance_df[attendance_df['student_id'].isin(dirty_ids)],
+        assessments_df[assessments_df['student_id'].isin(dirty_ids)],
+        fees_df[fees_df['student_id'].isin(dirty_ids)],
+        band_labels=band_labels, current_date=current_date, attendance_as_of=attendance_as_of
+    )
+    # A subject the previous ledger has never seen changes the column layout
+    if not set(dirty_ledger.columns) <= set(previous_ledger.columns):
+        return full_build()
+
+    clean_ledger = previous_ledger[previous_ledger['student_id'].isin(current.index)
+                                   & ~previous_ledger['student_id'].isin(dirty_ids)]
+    student_ledger = pd.concat([clean_ledger, dirty_ledger.reindex(columns=previous_ledger.columns)])
+    student_ledger = student_ledger.set_index('student_id').loc[students_df['student_id']].reset_index()
+    student_ledger = student_ledger[previous_ledger.columns]
+    for column, values in ring.attendance().items():
+        student_ledger[column] = values
+
+    # overdue_days moves with the calendar, so a new day refreshes it (and the scores) for everyone
+    previous_as_of = previous_fingerprints['as_of'].iloc[0] if len(previous_fingerprints) else as_of
+    if previous_as_of != as_of:
+        due_dates = pd.to_datetime(fees_df.set_index('student_id')['due_date'])
+        overdue_days = (current_date - due_dates).dt.days.fillna(0).astype(int)
+        student_ledger['overdue_days'] = student_ledger['student_id'].map(overdue_days)
+    # ...and an edited rule file or a new day of attendance rescores everyone as well
+    previous_rules = rules
+    if len(previous_fingerprints):
+        previous_rules = previous_fingerprints['rules'].iloc[0] if 'rules' in previous_fingerprints else None
+    if previous_as_of != as_of or previous_rules != rules or previous_attendance_as_of != day_string(attendance_as_of):
+        student_ledger = score_ledger(student_ledger.drop(columns=RISK_COLUMNS), band_labels=band_labels)
+
+    ring.save(ring_path)
+    return _restore_integer_columns(student_ledger), fingerprints, len(dirty_ids)
+
+
+def save_fingerprints(fingerprints, path=FINGERPRINTS_PATH):
+    fingerprints.to_csv(path, index=False)
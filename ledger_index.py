@@ -0,0 +1,70 @@
+import numpy as np
+import pandas as pd
+
+
+class IndexedLedger:
+    """
+    In-memory ledger with hash indexes on student_id and mentor_id, built once when the
+    ledger is loaded. Offers the same read API as ColumnarLedger, so the entry points look
+    up students and mentors the same way whichever ledger they are using.
+    """
+
+    def __init__(self, student_ledger):
+        self.ledger = student_ledger.reset_index(drop=True)
+        # student_id -> row position. Checking uniqueness builds pandas' hash table now, at load time,
+        # instead of on the first login; duplicated IDs still work, student_rows returns all their rows
+        self._student_index = pd.Index(self.ledger['student_id'])
+        if not self._student_index.is_unique:
+            duplicated = self._student_index[self._student_index.duplicated()].unique()
+            print(f"Warning: {len(duplicated):,} student IDs appear more than once in the ledger "
+                  f"(e.g. {duplicated[0]}); lookups return every row of such a student.")
+        # mentor_id -> row positions of the mentor's students
+        self._mentor_rows = self.ledger.groupby('mentor_id', sort=False).indices
+
+    def __len__(self):
+        return len(self.ledger)
+
+    @property
+    def columns(self):
+        return list(self.ledger.columns)
+
+    def student_rows(self, student_id):
+        """Row positions of one student (normally exactly one)."""
+        try:
+            location = self._student_index.get_loc(student_id)
+        except (KeyError, TypeError):
+            return np.empty(0, dtype=np.int64)
+        if isinstance(location, (int, np.integer)):
+            return np.array([location], dtype=np.int64)
+        return np.arange(len(self.ledger))[location]  # duplicated IDs give a slice or a mask
+
+    def mentor_rows(self, mentor_id):
+        """Row positions of every student assigned to one mentor."""
+        return self._mentor_rows.get(mentor_id, np.empty(0, dtype=np.int64))
+
+    def read(self, columns=None, rows=None):
+        """The requested columns (default: all) for the requested rows (default: all)."""
+        ledger = self.ledger if columns is None else self.ledger[list(columns)]
+        return ledger if rows is None else ledger.iloc[rows].reset_index(drop=True)
+
+    def read_student(self, student_id, columns=None):
+        return self.read(columns, self.student_rows(student_id))
+
+    def read_mentor(self, mentor_id, columns=None):
+        return self.read(columns, self.mentor_rows(mentor_id))
+
+
+class MentorDirectory:
+    """Hash index from login_id to the mentor records, so logins do not scan mentors.csv."""
+
+    def __init__(self, mentors_df):
+        self._by_login = {}
+        for record in mentors_df.to_dict('records'):
+            self._by_login.setdefault(record['login_id'], []).append(record)
+
+    def authenticate(self, login_id, password):
+        """Returns the mentor record matching both credentials, or None."""
+        for record in self._by_login.get(login_id, []):
+            if record['password'] == password:
+                return record
+        return None
@@ -0,0 +1,106 @@
+import os
+import threading
+from types import SimpleNamespace
+
+from ledger_store import COLUMNAR_LEDGER_PATH, SNAPSHOT_INPUTS
+
+# --- Configuration for Hot Reloads ---
+REFRESH_ENV = 'LEDGER_REFRESH_SECONDS'  # seconds between checks of the watched files; 0 turns reloading off
+REFRESH_INTERVAL_SECONDS = 30
+SNAPSHOT_META_PATH = os.path.join(COLUMNAR_LEDGER_PATH, 'meta.json')
+WATCHED_PATHS = SNAPSHOT_INPUTS + [SNAPSHOT_META_PATH]
+
+
+def refresh_interval():
+    """Seconds between checks of the watched files (LEDGER_REFRESH_SECONDS), or 0 when reloading is off."""
+    return float(os.environ.get(REFRESH_ENV, REFRESH_INTERVAL_SECONDS))
+
+
+def file_signature(paths):
+    """Modification time and size of each path that exists, to tell when any of them changed."""
+    signature = []
+    for path in paths:
+        try:
+            stat = os.stat(path)
+        except OSError:
+            continue
+        signature.append((path, stat.st_mtime_ns, stat.st_size))
+    return tuple(signature)
+
+
+class LedgerHandle:
+    """
+    Holds the ledger currently served, together with its indexes and a version number, as one
+    immutable state object. Publishing a new state is a single reference assignment, so readers
+    never take a lock: a callback reads `handle.state` once and keeps a consistent view of one
+    ledger even if a reload swaps in the next one while it runs.
+    """
+
+    def __init__(self):
+        self.state = None
+        self._version = 0
+        self._lock = threading.Lock()  # only serializes publishers
+
+    def publish(self, **fields):
+        """Swaps in a new state (the fields plus the next version number) and returns it."""
+        with self._lock:
+            self._version += 1
+            state = SimpleNamespace(version=self._version, **fields)
+            self.state = state
+        return state
+
+
+class LedgerRefresher:
+    """
+    Polls the input CSV files and the ledger snapshot on a daemon thread and calls reload() there,
+    off the request threads, once a change has settled (the files looked the same on two checks in a
+    row, so a half-written CSV is not picked up). A failed reload keeps the current ledger and is
+    retried on the next check.
+    """
+
+    def __init__(self, reload, watch_paths=WATCHED_PATHS, interval=None, name='ledger-refresher'):
+        self.reload = reload
+        self.watch_paths = list(watch_paths)
+        self.interval = refresh_interval() if interval is None else interval
+        self.name = name
+        self._signature = file_signature(self.watch_paths)
+        self._pending = None
+        self._thread = None
+        self._start_lock = threading.Lock()
+        self._stop = threading.Event()
+
+    def start(self):
+        """Starts the polling thread unless it is running or reloading is off. Safe to call repeatedly."""
+        if self._thread is not None or self.interval <= 0:
+            return self
+        with self._start_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+                self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+    def check(self):
+        """Reloads once if the watched files changed and have since settled; returns True if it did."""
+        signature = file_signature(self.watch_paths)
+        if signature == self._signature:
+            self._pending = None
+            return False
+        if signature != self._pending:
+            self._pending = signature  # still changing, or changed just now: look again next time
+            return False
+        try:
+            self.reload()
+        except (Exception, SystemExit) as e:
+            print(f"Ledger reload failed ({e!r}); keeping the current ledger.")
+            return False
+        # Taken after the reload, so a snapshot the reload wrote itself does not trigger another one
+        self._signature = file_signature(self.watch_paths)
+        self._pending = None
+        return True
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.check()
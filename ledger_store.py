@@ -0,0 +1,283 @@
+import json
+import os
+import shutil
+import time
+from contextlib import contextmanager
+from datetime import date
+
+try:
+    import fcntl
+except ImportError:  # Windows: no cross-process lock, every process may rebuild a stale snapshot
+    fcntl = None
+
+import numpy as np
+import pandas as pd
+
+from alert_feed import DIFF_COLUMNS, diff_ledgers, record_alerts
+from risk_calculator import RISK_RULES_PATH, risk_band_labels
+
+# --- Configuration for the Columnar Ledger ---
+COLUMNAR_LEDGER_PATH = 'student_ledger.cols'
+LEDGER_STARTUP_ENV = 'LEDGER_STARTUP'  # 'fast' (default) attaches to a fresh snapshot; 'rebuild' always rebuilds
+SNAPSHOT_INPUTS = ['students.csv', 'attendance.csv', 'assessments.csv', 'fees.csv', RISK_RULES_PATH]
+FORMAT_VERSION = 1
+
+
+def fast_start_requested():
+    """True unless LEDGER_STARTUP=rebuild asks the entry points to rebuild from the CSV files."""
+    return os.environ.get(LEDGER_STARTUP_ENV, 'fast').lower() != 'rebuild'
+
+
+def snapshot_staleness(path=COLUMNAR_LEDGER_PATH, input_paths=SNAPSHOT_INPUTS, today=None):
+    """None when the snapshot can be used as is, otherwise the reason it has to be rebuilt."""
+    meta_path = os.path.join(path, 'meta.json')
+    if not os.path.exists(meta_path):
+        return 'not found'
+    with open(meta_path) as f:
+        meta = json.load(f)
+    if meta.get('format_version') != FORMAT_VERSION:
+        return 'written in another format version'
+    # Overdue days (and with them risk scores) move every day
+    as_of = (today or date.today()).isoformat()
+    if meta.get('as_of') != as_of:
+        return f"built for {meta.get('as_of', 'an unknown date')}"
+    built = os.path.getmtime(meta_path)
+    for input_path in input_paths:
+        if os.path.exists(input_path) and os.path.getmtime(input_path) > built:
+            return f"older than '{input_path}'"
+    return None
+
+
+def open_columnar_ledger(path=COLUMNAR_LEDGER_PATH, band_labels=None):
+    """Returns the memory-mapped snapshot if fast start is on and the snapshot is fresh, otherwise None."""
+    if not fast_start_requested():
+        return None
+    staleness = snapshot_staleness(path)
+    if staleness is not None:
+        print(f"Ledger snapshot '{path}' cannot be used ({staleness}); rebuilding from the CSV files.")
+        return None
+    return ColumnarLedger(path, band_labels=band_labels)
+
+
+@contextmanager
+def snapshot_writer(path=COLUMNAR_LEDGER_PATH):
+    """
+    Holds an exclusive lock on '<path>.lock' while the snapshot is rebuilt, so when several
+    processes (e.g. the workers of a WSGI server) find it stale only one of them rebuilds it;
+    the others wait here and then attach to what it wrote. Not reentrant within a process.
+    """
+    if fcntl is None:
+        yield
+        return
+    with open(f'{path}.lock', 'a') as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def start_ledger(rebuild, band_labels=None, path=COLUMNAR_LEDGER_PATH):
+    """
+    Fast start for the entry points: returns (snapshot, None) with the memory-mapped ledger
+    snapshot, which is rebuilt first (by a single writer, see snapshot_writer) if it is missing
+    or stale. Every process of every app thus shares one copy of the ledger through the page
+    cache. With LEDGER_STARTUP=rebuild, or if the snapshot cannot be written, returns
+    (None, rebuild()) instead. Logs how long startup took either way. Risk bands are reported with
+    band_labels, by default the rule file's current labels.
+    """
+    start = time.perf_counter()
+    band_labels = band_labels or risk_band_labels()
+    action = 'attached to'
+    snapshot = open_columnar_ledger(path, band_labels=band_labels)
+    if snapshot is None and fast_start_requested():
+        with snapshot_writer(path):
+            # Another process may have rebuilt the snapshot while this one waited for the lock
+            if snapshot_staleness(path) is not None:
+                student_ledger = rebuild()
+                try:
+                    publish_snapshot(student_ledger, path, band_labels=band_labels)
+                except OSError as e:
+                    print(f"Warning: could not save the ledger snapshot '{path}' ({e}).")
+                    return _log_ready(start, student_ledger=student_ledger)
+                del student_ledger  # served from the snapshot, like in every other process
+                action = 'rebuilt'
+            snapshot = ColumnarLedger(path, band_labels=band_labels)
+    if snapshot is None:
+        return _log_ready(start, student_ledger=rebuild())
+    return _log_ready(start, snapshot=snapshot, action=action)
+
+
+def _log_ready(start, snapshot=None, student_ledger=None, action=None):
+    if snapshot is not None:
+        print(f"Ledger ready: {action} snapshot '{snapshot.path}' (version {snapshot.version}, "
+              f"{len(snapshot):,} rows) in {time.perf_counter() - start:.2f}s.")
+    else:
+        print(f"Ledger ready: rebuilt from the CSV files ({len(student_ledger):,} rows) "
+              f"in {time.perf_counter() - start:.2f}s.")
+    return snapshot, student_ledger
+
+
+# --- Writing ---
+def publish_snapshot(student_ledger, path=COLUMNAR_LEDGER_PATH, band_labels=None):
+    """
+    Replaces the snapshot with a new ledger (callers hold snapshot_writer), first appending the
+    band transitions since the snapshot it replaces to the alert feed. The previous snapshot's bands
+    are read with band_labels too, so both sides of the diff use the same labels.
+    """
+    band_labels = band_labels or risk_band_labels()
+    if snapshot_staleness(path) not in ('not found', 'written in another format version'):  # a snapshot to diff against
+        previous = ColumnarLedger(path, band_labels=band_labels)
+        alerts = diff_ledgers(previous.read(DIFF_COLUMNS), student_ledger, previous_labels=band_labels,
+                              band_labels=band_labels)
+        record_alerts(alerts, ledger_version=previous.version + 1)
+        del previous
+    write_columnar_ledger(student_ledger, path, band_labels=band_labels)
+
+
+def _encode_column(values):
+    """Returns (kind, data, categories) for one ledger column."""
+    if pd.api.types.is_numeric_dtype(values) and not pd.api.types.is_bool_dtype(values):
+        data = values.to_numpy()
+        if data.dtype.kind in 'iu' and len(data) and \
+                np.iinfo(np.int32).min <= data.min() and data.max() <= np.iinfo(np.int32).max:
+            data = data.astype(np.int32)
+        return 'numeric', data, None
+    # Text columns (names, branches, fee status, risk band and reasons) are stored as codes
+    codes, categories = pd.factorize(values.astype(object), sort=True)
+    return 'category', codes.astype(np.int32), np.asarray(categories, dtype=str)
+
+
+def _build_group_index(keys):
+    """Sorted unique keys, the row order that groups them, and CSR offsets into that order."""
+    order = np.argsort(keys, kind='stable')
+    unique_keys, starts = np.unique(keys[order], return_index=True)
+    offsets = np.append(starts, len(keys)).astype(np.int64)
+    return unique_keys, order.astype(np.int64), offsets
+
+
+def write_columnar_ledger(student_ledger, path=COLUMNAR_LEDGER_PATH, band_labels=None, as_of=None):
+    """
+    Writes the ledger as one .npy file per typed column plus student_id and mentor_id
+    indexes, so readers can memory-map just the columns and rows they need. The new
+    ledger is written to a temporary directory and then moved into place, with the version
+    of the snapshot it replaces plus one. as_of is the date the overdue days were computed
+    for (default: today), band_labels the labels the ledger was scored with (default: the rule
+    file's). Writers other than start_ledger should hold snapshot_writer.
+    """
+    tmp_path = f'{path}.tmp-{os.getpid()}'
+    shutil.rmtree(tmp_path, ignore_errors=True)
+    os.makedirs(tmp_path)
+
+    columns = []
+    for i, name in enumerate(student_ledger.columns):
+        kind, data, categories = _encode_column(student_ledger[name])
+        np.save(os.path.join(tmp_path, f'col{i}.npy'), data, allow_pickle=False)
+        if categories is not None:
+            np.save(os.path.join(tmp_path, f'col{i}.categories.npy'), categories, allow_pickle=False)
+        columns.append({'name': name, 'file': f'col{i}', 'kind': kind, 'dtype': str(data.dtype)})
+
+    for key in ['student_id', 'mentor_id']:
+        if key in student_ledger.columns:
+            unique_keys, order, offsets = _build_group_index(student_ledger[key].to_numpy())
+            np.save(os.path.join(tmp_path, f'index_{key}_keys.npy'), unique_keys, allow_pickle=False)
+            np.save(os.path.join(tmp_path, f'index_{key}_order.npy'), order, allow_pickle=False)
+            np.save(os.path.join(tmp_path, f'index_{key}_offsets.npy'), offsets, allow_pickle=False)
+
+    try:
+        with open(os.path.join(path, 'meta.json')) as f:
+            version = json.load(f).get('version', 0) + 1
+    except (OSError, ValueError):
+        version = 1
+    meta = {'format_version': FORMAT_VERSION, 'version': version, 'n_rows': len(student_ledger), 'columns': columns,
+            'as_of': (as_of or date.today()).isoformat(), 'band_labels': list(band_labels or risk_band_labels())}
+    with open(os.path.join(tmp_path, 'meta.json'), 'w') as f:
+        json.dump(meta, f, indent=2)
+
+    old_path = f'{path}.old-{os.getpid()}'
+    if os.path.exists(path):
+        os.rename(path, old_path)
+    os.rename(tmp_path, path)
+    shutil.rmtree(old_path, ignore_errors=True)
+
+
+# --- Reading ---
+class ColumnarLedger:
+    """
+    Read-only, memory-mapped view of a ledger written by write_columnar_ledger. With
+    band_labels, risk bands are reported with those labels whatever labels the writer used.
+    """
+
+    def __init__(self, path=COLUMNAR_LEDGER_PATH, band_labels=None):
+        self.path = path
+        with open(os.path.join(path, 'meta.json')) as f:
+            self.meta = json.load(f)
+        self._columns = {column['name']: column for column in self.meta['columns']}
+        self._arrays = {}
+        stored_labels = self.meta.get('band_labels') or risk_band_labels()
+        self._band_labels = dict(zip(stored_labels, band_labels or stored_labels))
+        self.map_all()
+
+    def map_all(self):
+        """
+        Maps every column and index file up front rather than on first use, so the view keeps
+        working after a newer snapshot replaces this one on disk (mapped files stay readable).
+        """
+        for name in sorted(os.listdir(self.path)):
+            if name.endswith('.npy'):
+                self._load(name[:-len('.npy')])
+
+    def __len__(self):
+        return self.meta['n_rows']
+
+    @property
+    def version(self):
+        return self.meta.get('version', 0)
+
+    @property
+    def columns(self):
+        return [column['name'] for column in self.meta['columns']]
+
+    def _load(self, file):
+        if file not in self._arrays:
+            self._arrays[file] = np.load(os.path.join(self.path, f'{file}.npy'), mmap_mode='r')
+        return self._arrays[file]
+
+    def _group_rows(self, key, value):
+        keys = self._load(f'index_{key}_keys')
+        i = np.searchsorted(keys, value)
+        if i == len(keys) or keys[i] != value:
+            return np.empty(0, dtype=np.int64)
+        offsets = self._load(f'index_{key}_offsets')
+        return np.sort(self._load(f'index_{key}_order')[offsets[i]:offsets[i + 1]])
+
+    def student_rows(self, student_id):
+        """Row positions of one student, found through the on-disk student_id index."""
+        return self._group_rows('student_id', student_id)
+
+    def mentor_rows(self, mentor_id):
+        """Row positions of every student assigned to one mentor."""
+        return self._group_rows('mentor_id', mentor_id)
+
+    def read(self, columns=None, rows=None):
+        """Materializes the requested columns (default: all) for the requested rows (default: all)."""
+        names = self.columns if columns is None else list(columns)
+        data = {}
+        for name in names:
+            column = self._columns[name]
+            values = self._load(column['file'])
+            values = np.array(values if rows is None else values[rows])
+            if column['kind'] == 'category':
+                categories = np.array(self._load(f"{column['file']}.categories"), dtype=object)
+                if name == 'risk_band':
+                    categories = np.array([self._band_labels.get(c, c) for c in categories], dtype=object)
+                values = pd.Categorical.from_codes(values, categories=categories)
+            data[name] = values
+        index = None if rows is None else pd.RangeIndex(len(rows))
+        return pd.DataFrame(data, index=index, columns=names)
+
+    def read_student(self, student_id, columns=None):
+        return self.read(columns, self.student_rows(student_id))
+
+    def read_mentor(self, mentor_id, columns=None):
+        return self.read(columns, self.mentor_rows(mentor_id))
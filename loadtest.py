@@ -0,0 +1,266 @@
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import random
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from ingest_schema import read_input
+
+# --- Configuration for the Load Test ---
+DEFAULT_MENTORS = 100
+DEFAULT_STUDENTS = 200
+DEFAULT_CONCURRENCY = 16
+RESULTS_PATH = 'loadtest_results.json'
+LOGIN_PASSWORD = 'password123'
+DEPENDENCIES_ENDPOINT = '/_dash-dependencies'
+UPDATE_ENDPOINT = '/_dash-update-component'
+TABLE_FILTER = '{risk_score} >= 40'
+PERCENTILES = [50, 95, 99]
+
+
+# --- Dash Client ---
+def split_outputs(output):
+    """The 'id.property' outputs of a dependency's output string ('..a.b...c.d..' for several outputs)."""
+    if output.startswith('..'):
+        return output[2:-2].split('...')
+    return [output]
+
+
+class DashClient:
+    """
+    Calls a Dash app's callbacks the way the browser does, with a POST to /_dash-update-component
+    carrying the inputs and state of one dependency from /_dash-dependencies. `target` is either the
+    app's Flask server, called in-process through its test client, or the base URL of a running server.
+    """
+
+    def __init__(self, target, dependencies=None):
+        self.base_url = target.rstrip('/') if isinstance(target, str) else None
+        self._test_client = None if self.base_url else target.test_client()
+        if dependencies is None:
+            dependencies = json.loads(self._request(DEPENDENCIES_ENDPOINT)[1])
+        self.dependencies = dependencies
+        # first output ('id.property', without any allow_duplicate suffix) -> dependency
+        self._by_output = {}
+        for dependency in dependencies:
+            self._by_output.setdefault(split_outputs(dependency['output'])[0].split('@')[0], dependency)
+
+    def _request(self, path, body=None):
+        """(status, response bytes) of a GET, or of a POST when there is a JSON body."""
+        if self._test_client is not None:
+            if body is None:
+                response = self._test_client.get(path)
+            else:
+                response = self._test_client.post(path, json=body)
+            return response.status_code, response.get_data()
+        data = None if body is None else json.dumps(body).encode('utf-8')
+        request = urllib.request.Request(self.base_url + path, data=data, headers={'Content-Type': 'application/json'})
+        try:
+            with urllib.request.urlopen(request) as response:
+                return response.status, response.read()
+        except urllib.error.HTTPError as e:
+            return e.code, e.read()
+
+    def call(self, output, inputs, state=None, changed=None):
+        """
+        Fires the callback whose first output is `output` with the given {'id.property': value}
+        inputs and state (props left out are sent as None). Returns (status, response payload or
+        None, response bytes, seconds); `changed` lists the inputs that triggered it (all by default).
+        """
+        dependency = self._by_output[output]
+        state = state or {}
+
+        def props(specs, values):
+            return [{'id': spec['id'], 'property': spec['property'],
+                     'value': values.get(f"{spec['id']}.{spec['property']}")} for spec in specs]
+
+        outputs = [dict(zip(['id', 'property'], name.split('.', 1))) for name in split_outputs(dependency['output'])]
+        body = {
+            'output': dependency['output'],
+            'outputs': outputs if len(outputs) > 1 else outputs[0],
+            'inputs': props(dependency['inputs'], inputs),
+            'state': props(dependency['state'], state),
+            'changedPropIds': list(changed or inputs),
+        }
+        start = time.perf_counter()
+        status, content = self._request(UPDATE_ENDPOINT, body)
+        seconds = time.perf_counter() - start
+        payload = json.loads(content) if status == 200 and content else None
+        return status, payload, len(content), seconds
+
+
+# --- Simulated Users ---
+def mentor_flow(client, login_id, record):
+    """A mentor session: login, overview, all-students, then a filter on the student table."""
+    _, payload, _, _ = record('login', client.call(
+        'session-token-store.data', {'login-button.n_clicks': 1},
+        {'login-input.value': login_id, 'password-input.value': LOGIN_PASSWORD, 'url.pathname': '/'}))
+    session = (payload or {}).get('response', {})
+    if 'session-token-store' not in session:
+        return
+    session_token = session['session-token-store']['data']
+    stores = {'login-id-store.data': session['login-id-store']['data'], 'session-token-store.data': session_token}
+
+    # The bell's alerts arrive with the page; opening the modal is a clientside callback, so it sends no request
+    record('overview', client.call('page-content-wrapper.children', {'url.pathname': '/overview'}, stores))
+    record('all_students', client.call('page-content-wrapper.children', {'url.pathname': '/all-students'}, stores))
+    record('filter', client.call(
+        'full-students-table.data',
+        {'full-students-table.page_current': 0, 'full-students-table.sort_by': [],
+         'full-students-table.filter_query': TABLE_FILTER},
+        {'session-token-store.data': session_token}, changed=['full-students-table.filter_query']))
+
+
+def student_flow(client, student_id, record):
+    """A student session: login, which returns the values the browser fills into the dashboard."""
+    record('login', client.call(
+        'dashboard-data.data', {'login-button.n_clicks': 1},
+        {'student-id-input.value': str(student_id), 'password-input.value': LOGIN_PASSWORD}))
+
+
+FLOWS = {'mentor': mentor_flow, 'student': student_flow}
+
+
+def simulate(targets, sessions, concurrency=DEFAULT_CONCURRENCY):
+    """
+    Runs the (app, user) sessions on `concurrency` threads, each thread with its own client per
+    app, and returns (samples, wall seconds) with one sample per callback request. targets maps
+    'mentor' and 'student' to an app's Flask server or base URL.
+    """
+    dependencies = {app: DashClient(target).dependencies for app, target in targets.items()}
+    local = threading.local()
+    samples = []
+
+    def client(app):
+        clients = local.__dict__.setdefault('clients', {})
+        if app not in clients:
+            clients[app] = DashClient(targets[app], dependencies[app])
+        return clients[app]
+
+    def run(session):
+        app, user = session
+
+        def record(step, result):
+            status, payload, n_bytes, seconds = result
+            samples.append({'app': app, 'step': step, 'status': status, 'ok': status in (200, 204),
+                            'latency_s': seconds, 'bytes': n_bytes})
+            return result
+
+        try:
+            FLOWS[app](client(app), user, record)
+        except Exception as e:  # a broken response ends this user's session, not the run
+            samples.append({'app': app, 'step': 'error', 'status': None, 'ok': False, 'latency_s': np.nan,
+                            'bytes': 0, 'error': repr(e)})
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(run, sessions))
+    return samples, time.perf_counter() - start
+
+
+def pick_sessions(n_mentors, n_students, seed=0):
+    """Random mentor logins and student IDs from mentors.csv and students.csv, interleaved."""
+    rng = random.Random(seed)
+    login_ids = read_input('mentors')['login_id'].astype(str).tolist()
+    student_ids = read_input('students')['student_id'].astype(int).tolist()
+    sessions = [('mentor', rng.choice(login_ids)) for _ in range(n_mentors)]
+    sessions += [('student', rng.choice(student_ids)) for _ in range(n_students)]
+    rng.shuffle(sessions)
+    return sessions
+
+
+# --- Report ---
+def summarize(samples, wall):
+    """
+    Per callback: requests, their share of all requests, errors, throughput in the mix, latency
+    percentiles (ms) and response sizes. All callbacks run together, so a callback's throughput
+    is its share of the run's overall throughput (mixed_rps), not what it could sustain alone.
+    """
+    table = pd.DataFrame(samples)
+    overall_rps = len(table) / wall
+    rows = []
+    for (app, step), group in table.groupby(['app', 'step'], sort=False):
+        latency_ms = group['latency_s'].dropna() * 1000
+        share = len(group) / len(table)
+        rows.append({
+            'app': app, 'step': step, 'requests': len(group), 'errors': int((~group['ok']).sum()),
+            'share_of_requests': round(share, 3), 'mixed_rps': round(share * overall_rps, 2),
+            **{f'p{p}_ms': round(float(np.percentile(latency_ms, p)), 2) if len(latency_ms) else None
+               for p in PERCENTILES},
+            'mean_bytes': int(group['bytes'].mean()), 'max_bytes': int(group['bytes'].max()),
+        })
+    return rows
+
+
+def print_summary(document):
+    overall = document['overall']
+    print(f"\n{overall['requests']:,} requests from {overall['sessions']:,} sessions in {overall['wall_s']:.2f}s "
+          f"({overall['throughput_rps']:.1f} requests/s, {overall['errors']} errors, "
+          f"concurrency {document['parameters']['concurrency']}):")
+    print(pd.DataFrame(document['callbacks']).to_string(index=False))
+
+
+def load_apps():
+    """Imports both Dash apps (each loads its ledger) and returns their Flask servers."""
+    with contextlib.redirect_stdout(io.StringIO()):
+        import app_mentor
+        import app_student
+    return {'mentor': app_mentor.server, 'student': app_student.server}
+
+
+def run_load_test(n_mentors=DEFAULT_MENTORS, n_students=DEFAULT_STUDENTS, concurrency=DEFAULT_CONCURRENCY,
+                  seed=0, mentor_url=None, student_url=None):
+    """Drives both apps with simulated users and returns the results document."""
+    targets = {}
+    if n_mentors:
+        targets['mentor'] = mentor_url
+    if n_students:
+        targets['student'] = student_url
+    if None in targets.values():
+        servers = load_apps()
+        targets = {app: target or servers[app] for app, target in targets.items()}
+    sessions = pick_sessions(n_mentors, n_students, seed)
+    print(f"Simulating {len(sessions):,} sessions on {concurrency} threads...")
+    samples, wall = simulate(targets, sessions, concurrency)
+    errors = sum(not sample['ok'] for sample in samples)
+    return {
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'machine': {'python': platform.python_version(), 'platform': platform.platform(),
+                    'cpu_count': os.cpu_count()},
+        'parameters': {'mentors': n_mentors, 'students': n_students, 'concurrency': concurrency, 'seed': seed,
+                       'targets': {app: target if isinstance(target, str) else 'in-process'
+                                   for app, target in targets.items()}},
+        'overall': {'sessions': len(sessions), 'requests': len(samples), 'errors': errors, 'wall_s': round(wall, 3),
+                    'throughput_rps': round(len(samples) / wall, 2)},
+        'callbacks': summarize(samples, wall),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Load-test the Dash apps through /_dash-update-component with concurrent simulated users.")
+    parser.add_argument('--mentors', type=int, default=DEFAULT_MENTORS, help="Simulated mentor sessions.")
+    parser.add_argument('--students', type=int, default=DEFAULT_STUDENTS, help="Simulated student sessions.")
+    parser.add_argument('--concurrency', type=int, default=DEFAULT_CONCURRENCY, help="Sessions run at once.")
+    parser.add_argument('--seed', type=int, default=0, help="Seed for picking the simulated users.")
+    parser.add_argument('--mentor-url', help="Base URL of a running app_mentor server (default: in-process).")
+    parser.add_argument('--student-url', help="Base URL of a running app_student server (default: in-process).")
+    parser.add_argument('--output', default=RESULTS_PATH, help="Where to write the JSON results.")
+    args = parser.parse_args()
+
+    document = run_load_test(args.mentors, args.students, args.concurrency, args.seed,
+                             args.mentor_url, args.student_url)
+    with open(args.output, 'w') as f:
+        json.dump(document, f, indent=2)
+    print_summary(document)
+    print(f"\nResults written to '{args.output}'.")
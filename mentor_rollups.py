@@ -0,0 +1,77 @@
+import numpy as np
+import pandas as pd
+
+from risk_calculator import risk_band_labels
+
+# --- Configuration for Mentor Rollups ---
+ROLLUP_INPUT_COLUMNS = ['mentor_id', 'branch', 'risk_band', 'risk_score', 'overall_avg_score', 'rolling_attendance_90d',
+                        'overdue_days']
+
+
+def band_count_column(label):
+    """The rollup column counting the students of one risk band, e.g. 'red_count' for 'Red'."""
+    return f'{str(label).lower()}_count'
+
+def build_mentor_rollups(student_ledger, band_labels=None):
+    """
+    Per-mentor KPIs from a scored ledger: student count, students per risk band, average risk
+    score, average assessment score, average attendance and students with overdue fees.
+    Returns (rollups, branch_rollups), where branch_rollups has the student and band counts per
+    (mentor_id, branch), with each mentor's branches in the order they first appear in the ledger.
+    """
+    band_labels = list(band_labels or risk_band_labels())
+    count_columns = [band_count_column(label) for label in band_labels]  # one per band, in band order
+    band_codes = pd.Categorical(student_ledger['risk_band'], categories=band_labels).codes
+    overdue_days = student_ledger['overdue_days'] if 'overdue_days' in student_ledger else 0
+    keyed = pd.DataFrame({
+        'mentor_id': student_ledger['mentor_id'].to_numpy(),
+        'branch': np.asarray(student_ledger['branch'], dtype=object),
+        'n_students': 1,
+        **{column: (band_codes == i).astype(np.int64) for i, column in enumerate(count_columns)},
+        'risk_score': student_ledger['risk_score'].to_numpy(dtype=float),
+        'overall_avg_score': student_ledger['overall_avg_score'].to_numpy(dtype=float),
+        'rolling_attendance_90d': student_ledger['rolling_attendance_90d'].to_numpy(dtype=float),
+        'overdue_fees': (np.asarray(overdue_days, dtype=float) > 0).astype(np.int64),
+    })
+
+    counts = {column: (column, 'sum') for column in ['n_students'] + count_columns}
+    rollups = keyed.groupby('mentor_id', sort=True).agg(
+        **counts,
+        avg_risk_score=('risk_score', 'mean'),
+        avg_score=('overall_avg_score', 'mean'),
+        avg_attendance=('rolling_attendance_90d', 'mean'),
+        overdue_fee_count=('overdue_fees', 'sum'),
+    ).reset_index()
+    branch_rollups = keyed.groupby(['mentor_id', 'branch'], sort=False).agg(**counts).reset_index()
+    branch_rollups = branch_rollups.sort_values('mentor_id', kind='stable', ignore_index=True)
+    return rollups, branch_rollups
+
+
+class MentorRollups:
+    """Rollup rows keyed by mentor_id, so the dashboard reads a mentor's KPIs in constant time."""
+
+    def __init__(self, rollups, branch_rollups):
+        self.rollups = rollups
+        self.branch_rollups = branch_rollups
+        self._by_mentor = {record['mentor_id']: record for record in rollups.to_dict('records')}
+        self._count_columns = [column for column in rollups.columns if column.endswith('_count')]
+        self._branches = {}
+        for record in branch_rollups.to_dict('records'):
+            self._branches.setdefault(record['mentor_id'], []).append(record)
+
+    @classmethod
+    def from_ledger(cls, student_ledger, band_labels=None):
+        return cls(*build_mentor_rollups(student_ledger, band_labels))
+
+    def get(self, mentor_id):
+        """The mentor's KPIs; a mentor without students gets zero counts and NaN averages."""
+        record = self._by_mentor.get(mentor_id)
+        if record is None:
+            record = {'mentor_id': mentor_id, 'n_students': 0, **{column: 0 for column in self._count_columns},
+                      'avg_risk_score': np.nan, 'avg_score': np.nan, 'avg_attendance': np.nan,
+                      'overdue_fee_count': 0}
+        return record
+
+    def branches(self, mentor_id):
+        """Student and band counts per branch of the mentor's students."""
+        return self._branches.get(mentor_id, [])
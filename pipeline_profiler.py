@@ -0,0 +1,104 @@
+import json
+import os
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime
+
+import pandas as pd
+
+# --- Configuration for Pipeline Profiling ---
+PROFILE_ENV = 'PIPELINE_PROFILE'  # 1 profiles the ledger build of the apps; 'memory' also traces memory
+PROFILE_REPORT_PATH = 'pipeline_profile.json'
+
+
+def profiling_requested():
+    """
+    What the PIPELINE_PROFILE environment variable asks for: 'memory' to profile with memory
+    tracing, True to profile times only, False for no profiling.
+    """
+    value = os.environ.get(PROFILE_ENV, '').lower()
+    if value == 'memory':
+        return 'memory'
+    return value in ('1', 'true', 'yes', 'on')
+
+
+class StageProfiler:
+    """
+    Records wall time, CPU time and row count for each stage of one pipeline run, and with
+    memory=True the peak memory delta (traced allocations above the stage's starting level).
+    tracemalloc slows allocation-heavy stages down several times, so times are only untraced
+    without memory. Stages are sequential, not nested. A disabled profiler runs the stages
+    without measuring anything.
+    """
+
+    def __init__(self, pipeline='pipeline', enabled=True, memory=False):
+        self.pipeline = pipeline
+        self.enabled = enabled
+        self.memory = memory
+        self.stages = []
+        self._started_tracing = False
+
+    @contextmanager
+    def stage(self, name, rows=None):
+        """Measures the enclosed block; set record['rows'] inside it if the count is only known there."""
+        record = {'stage': name, 'rows': rows}
+        if not self.enabled:
+            yield record
+            return
+        if self.memory:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                self._started_tracing = True
+            tracemalloc.reset_peak()
+            start_memory = tracemalloc.get_traced_memory()[0]
+        start_wall, start_cpu = time.perf_counter(), time.process_time()
+        try:
+            yield record
+        finally:
+            record['wall_s'] = round(time.perf_counter() - start_wall, 4)
+            record['cpu_s'] = round(time.process_time() - start_cpu, 4)
+            if self.memory:
+                record['peak_memory_delta_mb'] = round((tracemalloc.get_traced_memory()[1] - start_memory) / 2 ** 20, 2)
+            self.stages.append(record)
+
+    def run(self, name, fn, *args, **kwargs):
+        """Runs fn(*args, **kwargs) as one stage and uses the length of its result as the row count."""
+        with self.stage(name) as record:
+            result = fn(*args, **kwargs)
+            record['rows'] = len(result) if hasattr(result, '__len__') else None
+        return result
+
+    def summary(self):
+        """One row per stage, plus a total row."""
+        columns = ['stage', 'rows', 'wall_s', 'cpu_s'] + (['peak_memory_delta_mb'] if self.memory else [])
+        summary = pd.DataFrame(self.stages, columns=columns)
+        if len(summary):
+            total = {'stage': 'TOTAL', 'rows': '', 'wall_s': summary['wall_s'].sum(), 'cpu_s': summary['cpu_s'].sum()}
+            if self.memory:
+                total['peak_memory_delta_mb'] = summary['peak_memory_delta_mb'].max()
+            summary = pd.concat([summary, pd.DataFrame([total])], ignore_index=True)
+        return summary
+
+    def report(self, path=PROFILE_REPORT_PATH):
+        """Prints the summary table, writes the JSON report and stops memory tracing."""
+        if not self.enabled:
+            return
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+        summary = self.summary()
+        traced = ', times include memory tracing overhead' if self.memory else ''
+        print(f"\nPipeline profile ({self.pipeline}{traced}):")
+        print(summary.to_string(index=False, na_rep=''))
+        with open(path, 'w') as f:
+            json.dump({'pipeline': self.pipeline, 'created': datetime.now().isoformat(timespec='seconds'),
+                       'memory_traced': self.memory,
+                       'total_wall_s': round(sum(stage['wall_s'] for stage in self.stages), 4),
+                       'total_cpu_s': round(sum(stage['cpu_s'] for stage in self.stages), 4),
+                       'stages': self.stages}, f, indent=2)
+        print(f"Profile written to '{path}'.")
+
+
+# Shared no-op profiler for callers that did not ask for profiling
+NULL_PROFILER = StageProfiler(enabled=False)
@@ -1,134 +1,88 @@
 import pandas as pd
 import numpy as np
 from datetime import date, timedelta
+import os
 import sys
+import argparse
+
+from ledger_builder import (LEDGER_PATH, STREAM_CHUNK_ROWS, build_student_ledger, build_student_ledger_parallel,
+                            build_student_ledger_streaming, load_fingerprints, load_previous_ledger, save_fingerprints, update_student_ledger)
+from ingest_schema import read_input
+from pipeline_profiler import NULL_PROFILER, StageProfiler, profiling_requested
+from ledger_store import COLUMNAR_LEDGER_PATH, publish_snapshot, snapshot_writer
 
 # --- Configuration for Risk Scoring ---
 NUM_ASSESSMENTS_PER_SUBJECT = 3
-PASSING_ATTEMPTS_LIMIT = 3
 SUBJECTS = ['Mathematics-I', 'Physics', 'Programming']
 
 
-# --- Helper Functions (Risk Calculation) ---
-def calculate_risk(student):
-    risk_score = 0
-    risk_reasons = []
-
-    # 1. Attendance points
-    attendance = student['rolling_attendance_90d']
-    if pd.notna(attendance):
-        if 70 <= attendance < 85:
-            risk_score += 10
-            risk_reasons.append(f"Attendance {attendance:.2f}% (70-85)")
-        elif 50 <= attendance < 70:
-            risk_score += 25
-            risk_reasons.append(f"Attendance {attendance:.2f}% (50-70)")
-        elif attendance < 50:
-            risk_score += 50
-            risk_reasons.append(f"Attendance {attendance:.2f}% (<50%)")
-
-    # 2. Score trends and low score points (Overall)
-    overall_avg_score = student['overall_avg_score']
-    if pd.notna(overall_avg_score):
-        if 50 <= overall_avg_score < 60:
-            risk_score += 10
-            risk_reasons.append(f"Overall Avg Score {overall_avg_score:.2f}% (50-60%)")
-        elif 35 <= overall_avg_score < 50:
-            risk_score += 25
-            risk_reasons.append(f"Overall Avg Score {overall_avg_score:.2f}% (35-50%)")
-        elif overall_avg_score < 35:
-            risk_score += 50
-            risk_reasons.append(f"Overall Avg Score {overall_avg_score:.2f}% (<35%)")
-
-    # 3. Exhausted attempts
-    if student.get('max_attempts_overall', 0) >= (PASSING_ATTEMPTS_LIMIT - 1):
-        risk_score += 15
-        risk_reasons.append("Exhausted attempts for at least one subject")
-    if student.get('max_attempts_overall', 0) >= PASSING_ATTEMPTS_LIMIT:
-        risk_score += 35
-        risk_reasons.append("Attempts limit reached for at least one subject")
-
-    # 4. Fee overdue
-    overdue_days = student['overdue_days']
-    if pd.notna(overdue_days):
-        if 1 <= overdue_days <= 30:
-            risk_score += 10
-            risk_reasons.append(f"Overdue fees (1-30 days)")
-        elif 31 <= overdue_days <= 90:
-            risk_score += 25
-            risk_reasons.append(f"Overdue fees (31-90 days)")
-        elif overdue_days > 90:
-            risk_score += 40
-            risk_reasons.append(f"Overdue fees (>90 days)")
-
-    return risk_score, risk_reasons
-
-
-def map_risk_band(score):
-    if score >= 100:
-        return 'Red'
-    elif score >= 40:
-        return 'Amber'
-    else:
-        return 'Green'
-
-
 # --- Main Data Processing Script ---
-def process_all_data():
+def process_all_data(incremental=False, streaming=False, chunksize=STREAM_CHUNK_ROWS, workers=1, profile=False):
+    profiler = StageProfiler('process_mentor', memory=profile == 'memory') if profile else NULL_PROFILER
     try:
-        students_df = pd.read_csv('students.csv')
-        attendance_df = pd.read_csv('attendance.csv')
-        assessments_df = pd.read_csv('assessments.csv')
-        fees_df = pd.read_csv('fees.csv')
-        mentors_df = pd.read_csv('mentors.csv')
+        students_df = profiler.run('read_students', read_input, 'students')
+        fees_df = profiler.run('read_fees', read_input, 'fees')
+        if not streaming:
+            attendance_df = profiler.run('read_attendance', read_input, 'attendance')
+            assessments_df = profiler.run('read_assessments', read_input, 'assessments')
+        elif not (os.path.exists('attendance.csv') and os.path.exists('assessments.csv')):
+            raise FileNotFoundError('attendance.csv / assessments.csv')
+        mentors_df = profiler.run('read_mentors', read_input, 'mentors')
     except FileNotFoundError:
         print("Error: Required CSV files not found. Please run university_data_generator.py first.")
         sys.exit(1)
 
     # FUSE DATA & CALCULATE RISK
-    student_ledger = students_df.copy()
-
-    # Attendance
-    attendance_summary = attendance_df.groupby('student_id')['status'].apply(
-        lambda x: (x == 'Present').sum() / len(x) * 100 if len(x) > 0 else 0
-    ).reset_index(name='rolling_attendance_90d')
-    student_ledger = student_ledger.merge(attendance_summary, on='student_id', how='left')
-
-    # Assessments
-    assessments_df['date'] = pd.to_datetime(assessments_df['date'])
-    assessments_summary = assessments_df.groupby('student_id').agg(
-        overall_avg_score=('score', 'mean'),
-        max_attempts_overall=('attempts', 'max')
-    ).reset_index()
-    student_ledger = student_ledger.merge(assessments_summary, on='student_id', how='left')
-
-    assessments_summary_pivot = assessments_df.groupby(['student_id', 'subject'])[
-        'score'].mean().unstack().reset_index()
-    assessments_summary_pivot.columns = ['student_id'] + [f'avg_score_{col}' for col in
-                                                          assessments_summary_pivot.columns[1:]]
-    student_ledger = student_ledger.merge(assessments_summary_pivot, on='student_id', how='left')
-
-    # Fees
-    fees_df['due_date'] = pd.to_datetime(fees_df['due_date'])
-    current_date = pd.to_datetime(date.today())
-    fees_df['overdue_days'] = (current_date - fees_df['due_date']).dt.days.fillna(0).astype(int)
-    fees_summary = fees_df[['student_id', 'amount_due', 'amount_paid', 'status', 'overdue_days']]
-    student_ledger = student_ledger.merge(fees_summary, on='student_id', how='left')
-
-    # Apply risk calculation
-    student_ledger[['risk_score', 'risk_reasons']] = student_ledger.apply(
-        lambda row: pd.Series(calculate_risk(row)), axis=1
-    )
-    student_ledger['risk_band'] = student_ledger['risk_score'].apply(map_risk_band)
-    student_ledger['risk_reasons'] = student_ledger['risk_reasons'].apply(
-        lambda x: ', '.join(x) if x else 'No risk factors')
+    if incremental:
+        # Only students whose input rows changed since the last run are rebuilt
+        with profiler.stage('update_student_ledger', rows=len(students_df)):
+            student_ledger, fingerprints, dirty_count = update_student_ledger(
+                students_df, attendance_df, assessments_df, fees_df, load_previous_ledger(), load_fingerprints())
+        print(f"Incremental rebuild: {dirty_count} of {len(fingerprints)} students changed.")
+        save_fingerprints(fingerprints)
+    elif streaming:
+        # Attendance and assessments are folded into per-student counters chunk by chunk
+        student_ledger = build_student_ledger_streaming(students_df, fees_df, chunksize=chunksize,
+                                                        profiler=profiler)
+    elif workers != 1:
+        # Students are split into blocks that are aggregated and scored in a process pool
+        with profiler.stage('build_student_ledger_parallel', rows=len(students_df)):
+            student_ledger = build_student_ledger_parallel(students_df, attendance_df, assessments_df, fees_df,
+                                                           workers=workers)
+    else:
+        student_ledger = build_student_ledger(students_df, attendance_df, assessments_df, fees_df,
+                                              profiler=profiler)
 
     # Save the final ledger and return both dataframes
-    student_ledger.to_csv('student_ledger.csv', index=False)
-    mentors_df.to_csv('mentors.csv', index=False)  # Ensure mentors.csv is up-to-date
+    with profiler.stage('write_ledger_csv', rows=len(student_ledger)):
+        student_ledger.to_csv(LEDGER_PATH, index=False)
+    with profiler.stage('write_columnar_ledger', rows=len(student_ledger)), snapshot_writer(COLUMNAR_LEDGER_PATH):
+        publish_snapshot(student_ledger, COLUMNAR_LEDGER_PATH)  # memory-mappable copy for the apps, plus alerts
+    with profiler.stage('write_mentors_csv', rows=len(mentors_df)):
+        mentors_df.to_csv('mentors.csv', index=False)  # Ensure mentors.csv is up-to-date
     print("✅ Data processing complete. Ready to serve the web dashboard.")
+    profiler.report()
     return student_ledger, mentors_df
 
 
 if __name__ == "__main__":
-    process_all_data()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Build student_ledger.csv and the mentor rollups, and refresh mentors.csv.")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument('--incremental', action='store_true',
+                      help="Only rebuild students whose input rows changed since the last run.")
+    mode.add_argument('--streaming', action='store_true',
+                      help="Aggregate attendance.csv and assessments.csv in chunks with bounded memory.")
+    parser.add_argument('--chunksize', type=int, default=STREAM_CHUNK_ROWS,
+                        help="Rows per chunk in --streaming mode (default: %(default)s).")
+    parser.add_argument('--workers', type=int, default=1,
+                        help="Worker processes for a full rebuild; 0 uses every core (default: %(default)s).")
+    parser.add_argument('--profile', action='store_true',
+                        help="Print wall time, CPU time and rows per stage and write pipeline_profile.json.")
+    parser.add_argument('--profile-memory', action='store_true',
+                        help="Like --profile, plus each stage's peak memory (traced, which slows the stages down).")
+    args = parser.parse_args()
+    if args.workers != 1 and (args.incremental or args.streaming):
+        parser.error("--workers only applies to a full rebuild.")
+    process_all_data(incremental=args.incremental, streaming=args.streaming, chunksize=args.chunksize,
+                     workers=args.workers,
+                     profile='memory' if args.profile_memory else args.profile or profiling_requested())
\ No newline at end of file
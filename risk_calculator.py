@@ -0,0 +1,178 @@
+import hashlib
+import json
+import os
+import string
+
+import numpy as np
+import pandas as pd
+
+# --- Configuration for Risk Scoring ---
+# Every threshold, point value, reason text and band lives in the rule file; the entry points score with it
+RISK_RULES_ENV = 'RISK_RULES'  # path of a rule file to use instead of risk_rules.json
+RISK_RULES_PATH = os.environ.get(RISK_RULES_ENV) or os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                                                 'risk_rules.json')
+
+
+# --- Compiling the Rule File ---
+def _reason_template(rule_name, reason):
+    """Splits 'Attendance {value:.2f}% (<50%)' into ('Attendance ', '%.2f', '% (<50%)'); None for plain text."""
+    fields = [(text, field, spec) for text, field, spec, _ in string.Formatter().parse(reason)]
+    if all(field is None for _, field, _ in fields):
+        return None
+    if len(fields) > 2 or fields[0][1] != 'value' or (len(fields) == 2 and fields[1][1] is not None):
+        raise ValueError(f"Rule '{rule_name}': a reason can only hold one {{value}} field ({reason!r}).")
+    prefix, _, spec = fields[0]
+    suffix = fields[1][0] if len(fields) == 2 else ''
+    return prefix, f"%{spec or 'g'}", suffix
+
+
+class CompiledRule:
+    """
+    One rule compiled into bins: the bin edges of its column, and the points and reason of each bin.
+    A value falls in bin k when edges[k - 1] <= value < edges[k]; the last bin holds missing values,
+    which never score.
+    """
+
+    def __init__(self, name, column, bins):
+        self.name = name
+        self.column = column
+        self.edges = np.array(sorted({bound for spec in bins for bound in (spec.get('min'), spec.get('max'))
+                                      if bound is not None}), dtype=float)
+        n_bins = len(self.edges) + 1
+        self.points = np.zeros(n_bins + 1, dtype=np.int64)
+        self.texts = np.full(n_bins + 1, '', dtype=object)
+        self.templates = []  # (bin, prefix, printf format, suffix) of the reasons that show the value
+        lower = np.concatenate([[-np.inf], self.edges])
+        upper = np.concatenate([self.edges, [np.inf]])
+        owner = [None] * n_bins
+        for spec in bins:
+            covered = (lower >= spec.get('min', -np.inf)) & (upper <= spec.get('max', np.inf))
+            for k in np.flatnonzero(covered):
+                if owner[k] is not None:
+                    raise ValueError(f"Rule '{name}': bins {owner[k]} and {spec} overlap.")
+                owner[k] = spec
+                self.points[k] = spec['points']
+                template = _reason_template(name, spec.get('reason', ''))
+                if template is None:
+                    self.texts[k] = spec.get('reason', '')
+                else:
+                    self.templates.append((k, *template))
+
+    def bins(self, values):
+        """The bin of each value."""
+        bins = np.searchsorted(self.edges, values, side='right')
+        bins[np.isnan(values)] = len(self.edges) + 1
+        return bins
+
+    def reasons(self, values, bins):
+        """The reason of each value's bin ('' where the rule did not fire)."""
+        reasons = self.texts[bins]
+        for k, prefix, value_format, suffix in self.templates:
+            mask = bins == k
+            if mask.any():
+                reasons[mask] = prefix + np.char.mod(value_format, values[mask]).astype(object) + suffix
+        return reasons
+
+
+class ScoringPlan:
+    """The rule file compiled for vectorized scoring: one CompiledRule per rule, plus the band bins."""
+
+    def __init__(self, config, digest=None):
+        self.rules = [CompiledRule(rule['name'], rule['column'], rule['bins']) for rule in config['rules']]
+        bands = config['bands']  # highest risk first; the last band takes every score below the others
+        if any('min_score' not in band for band in bands[:-1]) or 'min_score' in bands[-1]:
+            raise ValueError("Every band but the last needs a min_score, and the last band must not have one.")
+        thresholds = [band['min_score'] for band in bands[:-1]]
+        if thresholds != sorted(thresholds, reverse=True):
+            raise ValueError("Bands must be listed from the highest min_score down.")
+        self.band_labels = tuple(band['label'] for band in bands)
+        self.band_displays = {band['label']: band.get('display', band['label']) for band in bands}
+        self.band_edges = np.array(thresholds[::-1], dtype=float)
+        self._band_by_bin = np.array(self.band_labels[::-1], dtype=object)
+        self.no_risk_reason = config.get('no_risk_reason', '')
+        self.digest = digest
+
+    @classmethod
+    def from_file(cls, path=RISK_RULES_PATH):
+        with open(path, 'rb') as f:
+            content = f.read()
+        return cls(json.loads(content), digest=hashlib.sha1(content).hexdigest()[:12])
+
+    def bands(self, risk_score, band_labels=None):
+        """The band of each score, named with band_labels (in band order) if given."""
+        labels = self._band_by_bin if band_labels is None else np.array(list(band_labels)[::-1], dtype=object)
+        return labels[np.searchsorted(self.band_edges, risk_score, side='right')]
+
+
+_plans = {}  # rule file path -> (modification time, compiled plan)
+
+
+def get_scoring_plan(path=RISK_RULES_PATH):
+    """The compiled plan of a rule file. It is compiled once and again only after the file changes."""
+    mtime = os.stat(path).st_mtime_ns
+    cached = _plans.get(path)
+    if cached is None or cached[0] != mtime:
+        cached = _plans[path] = (mtime, ScoringPlan.from_file(path))
+    return cached[1]
+
+
+def risk_band_labels(plan=None):
+    """
+    The band labels of the rule file, highest risk first. Read on every call rather than once at
+    import, because the rule file can change while a process runs.
+    """
+    return (plan or get_scoring_plan()).band_labels
+
+
+def band_display(label, plan=None):
+    """How a band is shown to students and mentors, e.g. 'Red (High)' for 'Red'."""
+    return (plan or get_scoring_plan()).band_displays.get(label, label)
+
+
+# --- Helper Functions (Column-wise Risk Calculation) ---
+def _column(student_ledger, column, default=np.nan):
+    """Returns a ledger column as a float array, or a constant array if the column is missing."""
+    if column in student_ledger.columns:
+        return pd.to_numeric(student_ledger[column], errors='coerce').to_numpy(dtype=float)
+    return np.full(len(student_ledger), default, dtype=float)
+
+
+def _join_reasons(reason_columns, n_rows):
+    """Joins the per-rule reason columns with ', ', skipping rules that did not fire."""
+    joined = np.full(n_rows, '', dtype=object)
+    for reasons in reason_columns:
+        fired = reasons != ''
+        extend = fired & (joined != '')
+        start = fired & ~extend
+        joined[extend] = joined[extend] + ', ' + reasons[extend]
+        joined[start] = reasons[start]
+    return joined
+
+
+def score_ledger(student_ledger, band_labels=None, plan=None):
+    """
+    Calculates the risk score, reasons and band for every student in the ledger at once with the
+    compiled rule file: each rule looks up the bin of its column, and the bins' points add up to the
+    score (missing values add no points; rules on the same column are additive). Bands are named
+    with band_labels, by default the rule file's own. Returns a copy of the ledger with the
+    'risk_score', 'risk_reasons' and 'risk_band' columns appended.
+    """
+    plan = plan or get_scoring_plan()
+    n_rows = len(student_ledger)
+    risk_score = np.zeros(n_rows, dtype=np.int64)
+    reason_columns = []
+    for rule in plan.rules:
+        values = _column(student_ledger, rule.column)
+        bins = rule.bins(values)
+        risk_score += rule.points[bins]
+        reason_columns.append(rule.reasons(values, bins))
+
+    risk_reasons = _join_reasons(reason_columns, n_rows)
+    risk_reasons[risk_reasons == ''] = plan.no_risk_reason
+    risk_band = plan.bands(risk_score, band_labels)
+
+    student_ledger = student_ledger.copy()
+    student_ledger['risk_score'] = risk_score
+    student_ledger['risk_reasons'] = pd.Series(risk_reasons, index=student_ledger.index, dtype=str)
+    student_ledger['risk_band'] = pd.Series(risk_band, index=student_ledger.index, dtype=str)
+    return student_ledger
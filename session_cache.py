@@ -0,0 +1,147 @@
+import base64
+import hashlib
+import hmac
+import json
+import os
+import secrets
+import threading
+import time
+from collections import OrderedDict
+
+from plotly.utils import PlotlyJSONEncoder
+
+# --- Configuration for Server-side Caches ---
+SESSION_TTL_SECONDS = 8 * 60 * 60  # a login stays valid for eight hours
+SESSION_SECRET_PATH = 'session_secret.key'  # shared by every worker; override with the SESSION_SECRET variable
+SLICE_TTL_SECONDS = 15 * 60  # a cached mentor slice is reloaded from the ledger after 15 minutes
+SLICE_CACHE_SIZE = 256
+PAGE_TTL_SECONDS = 60 * 60  # rendered pages are also keyed by ledger version, so this only bounds idle entries
+PAGE_CACHE_SIZE = 1024
+
+
+def serialize_layout(value):
+    """
+    The JSON-ready form of a component tree or figure, exactly as Dash sends it to the browser.
+    Caching this form means a repeat visit skips building the Plotly figures and components and
+    converting them to JSON.
+    """
+    return json.loads(json.dumps(value, cls=PlotlyJSONEncoder))
+
+
+class TTLCache:
+    """
+    Thread-safe LRU cache whose entries also expire ttl seconds after they were stored.
+    Dash serves callbacks from several threads, so every access takes the lock.
+    """
+
+    def __init__(self, maxsize, ttl, clock=time.monotonic):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.clock = clock
+        self._entries = OrderedDict()  # key -> (expires_at, value), least recently used first
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return default
+            if entry[0] <= self.clock():
+                del self._entries[key]
+                return default
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def put(self, key, value):
+        with self._lock:
+            self._entries[key] = (self.clock() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def pop(self, key, default=None):
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            return default if entry is None else entry[1]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def get_or_compute(self, key, compute):
+        """Returns the cached value for key, computing and storing it on a miss."""
+        value = self.get(key)
+        if value is None:
+            value = compute()
+            self.put(key, value)
+        return value
+
+
+class SessionStore:
+    """
+    Issues the opaque tokens handed to browsers and tells which user a token belongs to.
+    A token carries the user (as JSON, so its type survives) and its expiry, signed with
+    HMAC-SHA256, so any worker process that shares the secret can check it without a shared
+    session table.
+    """
+
+    def __init__(self, secret=None, ttl=SESSION_TTL_SECONDS, clock=time.time):
+        self.secret = secret if secret is not None else load_session_secret()
+        self.ttl = ttl
+        self.clock = clock
+
+    def _sign(self, payload):
+        return hmac.new(self.secret, payload, hashlib.sha256).digest()
+
+    def start(self, user_id):
+        payload = json.dumps([user_id, int(self.clock() + self.ttl)]).encode()
+        return f"{_b64encode(payload)}.{_b64encode(self._sign(payload))}"
+
+    def user(self, token):
+        """The user behind a token, or None if the token is malformed, forged or expired."""
+        if not token or token.count('.') != 1:
+            return None
+        try:
+            payload, signature = (_b64decode(part) for part in token.split('.'))
+        except ValueError:
+            return None
+        if not hmac.compare_digest(signature, self._sign(payload)):
+            return None
+        user_id, expires_at = json.loads(payload)
+        return user_id if expires_at > self.clock() else None
+
+
+def _b64encode(data):
+    return base64.urlsafe_b64encode(data).rstrip(b'=').decode()
+
+
+def _b64decode(text):
+    return base64.urlsafe_b64decode(text + '=' * (-len(text) % 4))
+
+
+def load_session_secret(path=SESSION_SECRET_PATH):
+    """
+    The key that signs session tokens: SESSION_SECRET from the environment if set, otherwise the
+    key in `path`, which the first process to start creates. Every worker on the host reads the same
+    file, so a token issued by one worker is accepted by all of them.
+    """
+    if os.environ.get('SESSION_SECRET'):
+        return os.environ['SESSION_SECRET'].encode()
+    try:
+        fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+    except FileExistsError:
+        for _ in range(50):  # another worker may have created the file but not written the key yet
+            with open(path, 'rb') as f:
+                secret = f.read()
+            if secret:
+                return secret
+            time.sleep(0.01)
+        raise ValueError(f"Session secret file '{path}' is empty.")
+    secret = secrets.token_bytes(32)
+    with os.fdopen(fd, 'wb') as f:
+        f.write(secret)
+    return secret
@@ -0,0 +1,90 @@
+import math
+import re
+
+import numpy as np
+import pandas as pd
+
+# --- Configuration for Server-side Tables ---
+STUDENT_TABLE_PAGE_SIZE = 15
+PREVIEW_TABLE_PAGE_SIZE = 5
+
+# One clause of a DataTable filter_query, e.g. {risk_score} >= 40 or {name} contains "Sharma"
+FILTER_CLAUSE = re.compile(
+    r'^\s*\{(?P<column>[^}]+)\}\s*'
+    r'(?P<operator>[is]?(?:>=|<=|!=|=|<|>|eq|ne|ge|le|gt|lt|contains|datestartswith))\s*'
+    r'(?P<value>.*?)\s*$')
+COMPARISONS = {'=': 'eq', '!=': 'ne', '>=': 'ge', '<=': 'le', '>': 'gt', '<': 'lt'}
+
+
+def parse_filter_query(filter_query):
+    """
+    Splits a DataTable filter_query into (column, operator, value, case_sensitive) clauses.
+    Only the '&&'-joined clauses the table's filter row produces are supported; clauses that
+    do not parse are ignored, as the native filter does.
+    """
+    clauses = []
+    for part in (filter_query or '').split(' && '):
+        match = FILTER_CLAUSE.match(part)
+        if match is None or not match['value']:
+            continue
+        operator = match['operator']
+        case_sensitive = not operator.startswith('i')
+        operator = operator[1:] if operator[0] in 'is' else operator
+        operator = COMPARISONS.get(operator, operator)
+        value = match['value']
+        if value[0] == value[-1] and value[0] in '"\'`' and len(value) > 1:
+            value = value[1:-1].replace('\\' + value[0], value[0])
+        else:
+            try:
+                value = float(value)
+            except ValueError:
+                pass
+        clauses.append((match['column'], operator, value, case_sensitive))
+    return clauses
+
+
+def _clause_mask(column, operator, value, case_sensitive):
+    if operator in ('contains', 'datestartswith'):
+        text = column.astype(str)
+        pattern = str(value)
+        if not case_sensitive:
+            text, pattern = text.str.lower(), pattern.lower()
+        if operator == 'contains':
+            return text.str.contains(pattern, regex=False)
+        return text.str.startswith(pattern)
+    if isinstance(value, float) and pd.api.types.is_numeric_dtype(column):
+        values = column
+    else:
+        # Text columns (and text values) compare as strings
+        values = column.astype(str)
+        value = f'{value:g}' if isinstance(value, float) else value
+        if not case_sensitive:
+            values, value = values.str.lower(), value.lower()
+    return getattr(values, operator)(value)
+
+
+def filter_rows(frame, filter_query):
+    """The rows of frame matching every clause of the filter_query."""
+    mask = np.ones(len(frame), dtype=bool)
+    for column, operator, value, case_sensitive in parse_filter_query(filter_query):
+        if column in frame:
+            mask &= np.asarray(_clause_mask(frame[column], operator, value, case_sensitive), dtype=bool)
+    return frame if mask.all() else frame[mask]
+
+
+def sort_rows(frame, sort_by):
+    """frame ordered by the table's sort_by list ([{'column_id': ..., 'direction': 'asc'|'desc'}])."""
+    sort_by = [entry for entry in (sort_by or []) if entry['column_id'] in frame]
+    if not sort_by:
+        return frame
+    return frame.sort_values([entry['column_id'] for entry in sort_by],
+                             ascending=[entry['direction'] == 'asc' for entry in sort_by],
+                             kind='stable', na_position='last')
+
+
+def page_of(frame, page_current, page_size):
+    """(rows of the requested page as records, page number, page count); the page is clamped to the last one."""
+    page_count = max(1, math.ceil(len(frame) / page_size))
+    page_current = min(max(page_current or 0, 0), page_count - 1)
+    start = page_current * page_size
+    return frame.iloc[start:start + page_size].to_dict('records'), page_current, page_count
@@ -0,0 +1,270 @@
+"""
+Regression tests: every way of building the ledger must score a small fixed cohort exactly
+as the original row-by-row pipeline (groupby/merge summaries + DataFrame.apply) did.
+"""
+import numpy as np
+import pandas as pd
+import pytest
+from pandas.testing import assert_frame_equal
+
+from ledger_builder import (build_student_ledger, build_student_ledger_dense, build_student_ledger_parallel,
+                            build_student_ledger_streaming, load_fingerprints, load_previous_ledger,
+                            save_fingerprints, update_student_ledger)
+from risk_calculator import score_ledger
+
+CURRENT_DATE = pd.Timestamp('2025-10-01')
+SUBJECTS = ['Mathematics-I', 'Physics', 'Programming']
+
+# (present days, recorded days); None = no attendance rows. Covers the 50/70/85 edges.
+ATTENDANCE_PATTERNS = [None, (9, 20), (10, 20), (13, 20), (14, 20), (16, 20), (17, 20), (20, 20), (2, 3)]
+# One score per subject; None = no assessments, nan = a row without a score. Covers the 35/50/60 edges.
+SCORE_PATTERNS = [None, (35, 35, 35), (40, 50, 60), (60, 60, 60), (34.99, 35, 35), (59.5, 59.5, 59.6),
+                  (80, 90, 70), (np.nan, 49, 51)]
+# Highest attempts on any assessment; 2 and 3 are the thresholds
+ATTEMPTS_PATTERNS = [1, 2, 3, 4, 1, 2, 3]
+# Days past the fee due date; None = no fee row. Covers the 1/30/31/90/91 edges.
+OVERDUE_PATTERNS = [0, 1, 30, 31, 90, 91, -10, 200, None, 29, 89]
+
+NUM_STUDENTS = 40
+BASELINE_COLUMNS = ['student_id', 'name', 'branch', 'guardian_contact', 'mentor_id', 'rolling_attendance_90d',
+                    'overall_avg_score', 'max_attempts_overall', 'avg_score_Mathematics-I', 'avg_score_Physics',
+                    'avg_score_Programming', 'amount_due', 'amount_paid', 'status', 'overdue_days', 'risk_score',
+                    'risk_reasons', 'risk_band']
+
+
+# --- Baseline (row-by-row) scoring, as process_student.py originally did it ---
+def baseline_calculate_risk(student):
+    risk_score = 0
+    risk_reasons = []
+
+    attendance = student['rolling_attendance_90d']
+    if pd.notna(attendance):
+        if 70 <= attendance < 85:
+            risk_score += 10
+            risk_reasons.append(f"Attendance {attendance:.2f}% (70-85)")
+        elif 50 <= attendance < 70:
+            risk_score += 25
+            risk_reasons.append(f"Attendance {attendance:.2f}% (50-70)")
+        elif attendance < 50:
+            risk_score += 50
+            risk_reasons.append(f"Attendance {attendance:.2f}% (<50%)")
+
+    overall_avg_score = student['overall_avg_score']
+    if pd.notna(overall_avg_score):
+        if 50 <= overall_avg_score < 60:
+            risk_score += 10
+            risk_reasons.append(f"Overall Avg Score {overall_avg_score:.2f}% (50-60%)")
+        elif 35 <= overall_avg_score < 50:
+            risk_score += 25
+            risk_reasons.append(f"Overall Avg Score {overall_avg_score:.2f}% (35-50%)")
+        elif overall_avg_score < 35:
+            risk_score += 50
+            risk_reasons.append(f"Overall Avg Score {overall_avg_score:.2f}% (<35%)")
+
+    if student.get('max_attempts_overall', 0) >= 2:
+        risk_score += 15
+        risk_reasons.append("Exhausted attempts for at least one subject")
+    if student.get('max_attempts_overall', 0) >= 3:
+        risk_score += 35
+        risk_reasons.append("Attempts limit reached for at least one subject")
+
+    overdue_days = student['overdue_days']
+    if pd.notna(overdue_days):
+        if 1 <= overdue_days <= 30:
+            risk_score += 10
+            risk_reasons.append("Overdue fees (1-30 days)")
+        elif 31 <= overdue_days <= 90:
+            risk_score += 25
+            risk_reasons.append("Overdue fees (31-90 days)")
+        elif overdue_days > 90:
+            risk_score += 40
+            risk_reasons.append("Overdue fees (>90 days)")
+
+    return risk_score, risk_reasons
+
+
+def baseline_map_risk_band(score):
+    if score >= 100:
+        return 'Red'
+    elif score >= 40:
+        return 'Amber'
+    else:
+        return 'Green'
+
+
+def baseline_score(student_ledger):
+    student_ledger = student_ledger.copy()
+    student_ledger[['risk_score', 'risk_reasons']] = student_ledger.apply(
+        lambda row: pd.Series(baseline_calculate_risk(row)), axis=1
+    )
+    student_ledger['risk_band'] = student_ledger['risk_score'].apply(baseline_map_risk_band)
+    student_ledger['risk_reasons'] = student_ledger['risk_reasons'].apply(
+        lambda x: ', '.join(x) if x else 'No risk factors')
+    return student_ledger
+
+
+def baseline_ledger(students_df, attendance_df, assessments_df, fees_df, current_date=CURRENT_DATE):
+    student_ledger = students_df.copy()
+
+    attendance_summary = attendance_df.groupby('student_id')['status'].apply(
+        lambda x: (x == 'Present').sum() / len(x) * 100 if len(x) > 0 else 0
+    ).reset_index(name='rolling_attendance_90d')
+    student_ledger = student_ledger.merge(attendance_summary, on='student_id', how='left')
+
+    assessments_summary = assessments_df.groupby('student_id').agg(
+        overall_avg_score=('score', 'mean'),
+        max_attempts_overall=('attempts', 'max')
+    ).reset_index()
+    student_ledger = student_ledger.merge(assessments_summary, on='student_id', how='left')
+
+    assessments_summary_pivot = assessments_df.groupby(['student_id', 'subject'])[
+        'score'].mean().unstack().reset_index()
+    assessments_summary_pivot.columns = ['student_id'] + [f'avg_score_{col}' for col in
+                                                          assessments_summary_pivot.columns[1:]]
+    student_ledger = student_ledger.merge(assessments_summary_pivot, on='student_id', how='left')
+
+    fees_df = fees_df.copy()
+    fees_df['due_date'] = pd.to_datetime(fees_df['due_date'])
+    fees_df['overdue_days'] = (current_date - fees_df['due_date']).dt.days.fillna(0).astype(int)
+    fees_summary = fees_df[['student_id', 'amount_due', 'amount_paid', 'status', 'overdue_days']]
+    student_ledger = student_ledger.merge(fees_summary, on='student_id', how='left')
+
+    return baseline_score(student_ledger)
+
+
+# --- Fixed cohort ---
+def make_cohort():
+    """Cycles every student through the edge patterns; the pattern lists have different lengths."""
+    students, attendance, assessments, fees = [], [], [], []
+    for i in range(NUM_STUDENTS):
+        student_id = 2000 + i
+        students.append({'student_id': student_id, 'name': f'Student {i}', 'branch': 'Mechanical',
+                         'guardian_contact': 9876540000 + i, 'mentor_id': 1000 + i % 3})
+
+        pattern = ATTENDANCE_PATTERNS[i % len(ATTENDANCE_PATTERNS)]
+        if pattern is not None:
+            present, recorded = pattern
+            for day in range(recorded):
+                attendance.append({'student_id': student_id,
+                                   'date': str((CURRENT_DATE - pd.Timedelta(days=day + 1)).date()),
+                                   'status': 'Present' if day < present else ('Late' if day % 2 else 'Absent')})
+
+        scores = SCORE_PATTERNS[i % len(SCORE_PATTERNS)]
+        if scores is not None:
+            max_attempts = ATTEMPTS_PATTERNS[i % len(ATTEMPTS_PATTERNS)]
+            for j, (subject, score) in enumerate(zip(SUBJECTS, scores)):
+                assessments.append({'student_id': student_id, 'assessment_id': f'{subject}_1',
+                                    'date': str((CURRENT_DATE - pd.Timedelta(days=10 + j)).date()),
+                                    'subject': subject, 'score': score, 'max_score': 100,
+                                    'attempts': max_attempts if j == i % len(SUBJECTS) else 1})
+
+        overdue = OVERDUE_PATTERNS[i % len(OVERDUE_PATTERNS)]
+        if overdue is not None:
+            due_date = str((CURRENT_DATE - pd.Timedelta(days=overdue)).date())
+            fees.append({'student_id': student_id, 'due_date': due_date, 'amount_due': 150000,
+                         'amount_paid': 150000 if overdue <= 0 else 50000,
+                         'status': 'Paid' if overdue <= 0 else 'Pending', 'last_payment_date': due_date})
+    return pd.DataFrame(students), pd.DataFrame(attendance), pd.DataFrame(assessments), pd.DataFrame(fees)
+
+
+@pytest.fixture
+def cohort(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    students_df, attendance_df, assessments_df, fees_df = make_cohort()
+    for name, df in [('students', students_df), ('attendance', attendance_df),
+                     ('assessments', assessments_df), ('fees', fees_df)]:
+        df.to_csv(tmp_path / f'{name}.csv', index=False)
+    return students_df, attendance_df, assessments_df, fees_df
+
+
+def assert_matches_baseline(ledger, expected):
+    actual = ledger[BASELINE_COLUMNS].sort_values('student_id').reset_index(drop=True)
+    expected = expected[BASELINE_COLUMNS].sort_values('student_id').reset_index(drop=True)
+    assert_frame_equal(actual, expected, check_dtype=False, check_exact=True)
+
+
+def test_cohort_covers_edges(cohort):
+    expected = baseline_ledger(*cohort)
+    assert expected['rolling_attendance_90d'].isna().any()
+    assert expected['overall_avg_score'].isna().any()
+    assert {50.0, 70.0, 85.0} <= set(expected['rolling_attendance_90d'])
+    assert {35.0, 50.0, 60.0} <= set(expected['overall_avg_score'])
+    assert {1, 2, 3} <= set(expected['max_attempts_overall'])
+    assert {0, 1, 30, 31, 90, 91} <= set(expected['overdue_days'])
+    assert expected['overdue_days'].isna().any()
+    assert set(expected['risk_band']) == {'Red', 'Amber', 'Green'}
+
+
+# --- Scoring ---
+def test_score_ledger_matches_row_scoring():
+    features = pd.DataFrame({
+        'student_id': range(12),
+        'rolling_attendance_90d': [np.nan, 49.99, 50, 69.99, 70, 84.99, 85, 100, 0, np.nan, 66.666, 50],
+        'overall_avg_score': [np.nan, 34.99, 35, 49.99, 50, 59.99, 60, np.nan, 0, 100, 35, 50],
+        'max_attempts_overall': [np.nan, 1, 2, 3, 4, 0, 1, 2, 3, np.nan, 2, 3],
+        'overdue_days': [np.nan, -5, 0, 1, 30, 31, 90, 91, 365, 15, np.nan, 60],
+    })
+    assert_frame_equal(score_ledger(features), baseline_score(features), check_dtype=False, check_exact=True)
+
+
+# --- Ledger builds ---
+def test_build_student_ledger(cohort):
+    ledger = build_student_ledger(*cohort, current_date=CURRENT_DATE)
+    assert_matches_baseline(ledger, baseline_ledger(*cohort))
+
+
+def test_build_student_ledger_dense(cohort):
+    ledger = build_student_ledger_dense(*cohort, current_date=CURRENT_DATE)
+    assert_matches_baseline(ledger, baseline_ledger(*cohort))
+
+
+def test_build_student_ledger_with_duplicate_students(cohort):
+    # A repeated student row takes the merge-based path instead of the dense one
+    students_df, attendance_df, assessments_df, fees_df = cohort
+    students_df = pd.concat([students_df, students_df.iloc[[3]]], ignore_index=True)
+    ledger = build_student_ledger(students_df, attendance_df, assessments_df, fees_df, current_date=CURRENT_DATE)
+    assert_matches_baseline(ledger, baseline_ledger(students_df, attendance_df, assessments_df, fees_df))
+
+
+@pytest.mark.parametrize('chunksize', [7, 1000])
+def test_build_student_ledger_streaming(cohort, chunksize):
+    students_df, _, _, fees_df = cohort
+    ledger = build_student_ledger_streaming(students_df, fees_df, chunksize=chunksize, current_date=CURRENT_DATE)
+    assert_matches_baseline(ledger, baseline_ledger(*cohort))
+
+
+def test_build_student_ledger_parallel(cohort):
+    ledger = build_student_ledger_parallel(*cohort, workers=3, current_date=CURRENT_DATE)
+    assert_matches_baseline(ledger, baseline_ledger(*cohort))
+
+
+def test_update_student_ledger(cohort, tmp_path):
+    students_df, attendance_df, assessments_df, fees_df = cohort
+    ring_path = tmp_path / 'attendance_ring.npz'
+    ledger, fingerprints, dirty = update_student_ledger(*cohort, None, None, current_date=CURRENT_DATE,
+                                                        ring_path=ring_path)
+    assert dirty == NUM_STUDENTS
+    assert_matches_baseline(ledger, baseline_ledger(*cohort))
+
+    # Round-trip the state through disk, as consecutive runs do
+    ledger.to_csv(tmp_path / 'student_ledger.csv', index=False)
+    save_fingerprints(fingerprints, tmp_path / 'fingerprints.csv')
+    previous_ledger = load_previous_ledger(tmp_path / 'student_ledger.csv')
+    previous_fingerprints = load_fingerprints(tmp_path / 'fingerprints.csv')
+
+    # Next day: one new attendance day for everyone who has attendance, one score and one fee edited
+    next_date = CURRENT_DATE + pd.Timedelta(days=1)
+    new_day = pd.DataFrame({'student_id': attendance_df['student_id'].unique(),
+                            'date': str(CURRENT_DATE.date()), 'status': 'Absent'})
+    attendance_df = pd.concat([attendance_df, new_day], ignore_index=True)
+    assessments_df = assessments_df.copy()
+    assessments_df.loc[assessments_df['student_id'] == 2001, 'score'] = 20.0
+    fees_df = fees_df.copy()
+    fees_df.loc[fees_df['student_id'] == 2002, 'due_date'] = str((next_date - pd.Timedelta(days=95)).date())
+
+    ledger, _, dirty = update_student_ledger(students_df, attendance_df, assessments_df, fees_df,
+                                             previous_ledger, previous_fingerprints, current_date=next_date,
+                                             ring_path=ring_path)
+    assert dirty == 2
+    expected = baseline_ledger(students_df, attendance_df, assessments_df, fees_df, current_date=next_date)
+    assert_matches_baseline(ledger, expected)
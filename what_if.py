@@ -0,0 +1,230 @@
+import argparse
+import copy
+import json
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from ledger_builder import LEDGER_PATH, load_previous_ledger
+from ledger_store import COLUMNAR_LEDGER_PATH, ColumnarLedger
+from risk_calculator import RISK_RULES_PATH, ScoringPlan
+
+# --- Configuration for What-if Scoring ---
+SCENARIO_BLOCK = 64  # scenarios scored together; bounds the (scenarios x students) score matrix
+SUMMARY_PATH = 'what_if_summary.csv'
+CHANGES_PATH = 'what_if_changes.csv'
+BASELINE = 'baseline'
+KEY_COLUMNS = ['student_id', 'mentor_id']
+
+
+# --- Scenarios ---
+def apply_changes(config, edges=None, points=None):
+    """
+    A copy of a rule file config with some thresholds moved and some points replaced.
+    edges maps a rule name (or 'bands') to {old bound: new bound}; every bin bound (or band
+    min_score) equal to the old bound moves. points maps a rule name to the points of its bins.
+    """
+    config = copy.deepcopy(config)
+    rules = {rule['name']: rule for rule in config['rules']}
+    for name, moves in (edges or {}).items():
+        if name != 'bands' and name not in rules:
+            raise ValueError(f"Unknown rule '{name}'.")
+        for old, new in moves.items():
+            old, moved = float(old), False
+            if name == 'bands':
+                bounds = [(band, 'min_score') for band in config['bands']]
+            else:
+                bounds = [(spec, key) for spec in rules[name]['bins'] for key in ('min', 'max')]
+            for spec, key in bounds:
+                if key in spec and spec[key] == old:
+                    spec[key], moved = new, True
+            if not moved:
+                raise ValueError(f"'{name}' has no bound at {old:g}.")
+        if name == 'bands':
+            _check_bands(config['bands'])
+        else:
+            _check_bins(name, rules[name]['bins'])
+    for name, values in (points or {}).items():
+        if name not in rules:
+            raise ValueError(f"Unknown rule '{name}'.")
+        if len(values) != len(rules[name]['bins']):
+            raise ValueError(f"'{name}' has {len(rules[name]['bins'])} bins, got {len(values)} points.")
+        for spec, value in zip(rules[name]['bins'], values):
+            spec['points'] = value
+    return config
+
+
+def _check_bins(name, bins):
+    """A moved bound must leave every bin non-empty and the bins in ascending, non-overlapping order."""
+    for spec in bins:
+        if spec.get('min', -np.inf) >= spec.get('max', np.inf):
+            raise ValueError(f"Rule '{name}': bin {spec} is empty after the move (min must be below max).")
+    for lower, upper in zip(bins, bins[1:]):
+        if lower.get('max', np.inf) > upper.get('min', -np.inf):
+            raise ValueError(f"Rule '{name}': bins {lower} and {upper} are out of order after the move.")
+
+
+def _check_bands(bands):
+    min_scores = [band['min_score'] for band in bands if 'min_score' in band]
+    if any(higher <= lower for higher, lower in zip(min_scores, min_scores[1:])):
+        raise ValueError(f"Bands: min_scores {min_scores} are no longer in descending order after the move.")
+
+
+def load_scenarios(path, config):
+    """
+    [(name, config)] from a JSON list of {"name": ..., "edges": {...}, "points": {...}}
+    scenarios (see apply_changes), each applied to the base config.
+    """
+    with open(path) as f:
+        specs = json.load(f)
+    return [(spec['name'], apply_changes(config, spec.get('edges'), spec.get('points'))) for spec in specs]
+
+
+def parse_move(move, config):
+    """Scenarios for one '--move rule:old=new1,new2,...' option, one per new bound."""
+    target, _, values = move.partition('=')
+    name, _, old = target.partition(':')
+    if not values or not old:
+        raise ValueError(f"Expected RULE:OLD=NEW[,NEW...], got '{move}'.")
+    return [(f'{name} {old}->{value}', apply_changes(config, edges={name: {old: float(value)}}))
+            for value in values.split(',')]
+
+
+# --- Features ---
+def load_features(columns, path=COLUMNAR_LEDGER_PATH, ledger_path=LEDGER_PATH):
+    """
+    The aggregated per-student features the rules read, plus student_id and mentor_id: from the
+    ledger snapshot when there is one, else from student_ledger.csv.
+    """
+    columns = list(dict.fromkeys(KEY_COLUMNS + list(columns)))
+    if os.path.exists(os.path.join(path, 'meta.json')):
+        snapshot = ColumnarLedger(path)
+        print(f"Features: ledger snapshot '{path}' ({len(snapshot):,} students, as of {snapshot.meta.get('as_of')}).")
+        return snapshot.read([column for column in columns if column in snapshot.columns])
+    student_ledger = load_previous_ledger(ledger_path)
+    if student_ledger is None:
+        raise FileNotFoundError(f"Neither '{path}' nor '{ledger_path}' exists; run process_mentor.py first.")
+    print(f"Features: '{ledger_path}' ({len(student_ledger):,} students).")
+    return student_ledger[[column for column in columns if column in student_ledger.columns]]
+
+
+# --- Batched Scoring ---
+def _column(features, column):
+    if column in features.columns:
+        return pd.to_numeric(features[column], errors='coerce').to_numpy(dtype=float)
+    return np.full(len(features), np.nan)
+
+
+def _level_tables(features, plans):
+    """
+    For each rule: (level of every student, points of every level in every scenario). The
+    levels are the bins of the union of all scenarios' edges, so one lookup per rule serves
+    every scenario; the last level holds missing values, which never score.
+    """
+    tables = []
+    for i, rule in enumerate(plans[0].rules):
+        rules = [plan.rules[i] for plan in plans]
+        edges = np.unique(np.concatenate([r.edges for r in rules]))
+        values = _column(features, rule.column)
+        levels = np.searchsorted(edges, values, side='right')
+        levels[np.isnan(values)] = len(edges) + 1
+        lowest = np.concatenate([[-np.inf], edges])  # a value in each level, for looking up its bin
+        points = np.zeros((len(plans), len(edges) + 2), dtype=np.int32)
+        for s, r in enumerate(rules):
+            points[s, :-1] = r.points[np.searchsorted(r.edges, lowest, side='right')]
+        tables.append((levels, points))
+    return tables
+
+
+def score_scenarios(features, plans, block=SCENARIO_BLOCK):
+    """
+    Scores every student under every plan in one batched pass over the features. Returns
+    (risk scores, band codes), both (plans x students); band code i is plans[0].band_labels[i].
+    The plans must come from the same rule file layout (same rules and bands, other bounds/points).
+    """
+    for plan in plans[1:]:
+        if [r.name for r in plan.rules] != [r.name for r in plans[0].rules] \
+                or plan.band_labels != plans[0].band_labels:
+            raise ValueError("All scenarios need the rules and bands of the base rule file.")
+    tables = _level_tables(features, plans)
+    band_edges = np.stack([plan.band_edges for plan in plans])
+    n_bands = len(plans[0].band_labels)
+    scores = np.empty((len(plans), len(features)), dtype=np.int32)
+    codes = np.empty((len(plans), len(features)), dtype=np.int8)
+    for start in range(0, len(plans), block):
+        rows = slice(start, start + block)
+        score = sum(np.take(points[rows], levels, axis=1) for levels, points in tables)
+        scores[rows] = score
+        # bin of each score among its scenario's band edges; bins count up from the lowest-risk band
+        bins = (score[:, :, None] >= band_edges[rows, None, :]).sum(axis=2)
+        codes[rows] = n_bands - 1 - bins
+    return scores, codes
+
+
+def what_if(features, scenarios, base_config):
+    """
+    Scores the cohort under the base rules and every (name, config) scenario. Returns
+    (summary, changes): per scenario the students in each band and how many changed band
+    (riskier or safer); and one row per student whose band differs from the baseline.
+    """
+    names = [BASELINE] + [name for name, _ in scenarios]
+    plans = [ScoringPlan(base_config)] + [ScoringPlan(config) for _, config in scenarios]
+    scores, codes = score_scenarios(features, plans)
+    labels = np.array(plans[0].band_labels, dtype=object)
+    n_bands = len(labels)
+
+    summary, changes = [], []
+    for s, name in enumerate(names):
+        counts = np.bincount(codes[s], minlength=n_bands)
+        moved = np.flatnonzero(codes[s] != codes[0])
+        riskier = int((codes[s][moved] < codes[0][moved]).sum())
+        summary.append({'scenario': name, **dict(zip(labels, counts.tolist())), 'changed': len(moved),
+                        'riskier': riskier, 'safer': len(moved) - riskier})
+        if s and len(moved):
+            changed = features.iloc[moved][KEY_COLUMNS].reset_index(drop=True)
+            changed.insert(0, 'scenario', name)
+            changed['risk_score'] = scores[0][moved]
+            changed['scenario_score'] = scores[s][moved]
+            changed['risk_band'] = labels[codes[0][moved]]
+            changed['scenario_band'] = labels[codes[s][moved]]
+            changes.append(changed)
+    columns = ['scenario'] + KEY_COLUMNS + ['risk_score', 'scenario_score', 'risk_band', 'scenario_band']
+    changes = pd.concat(changes, ignore_index=True) if changes else pd.DataFrame(columns=columns)
+    return pd.DataFrame(summary), changes
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Re-score the whole cohort under alternative rule sets and report who changes band.")
+    parser.add_argument('scenarios', nargs='?', help="JSON list of scenarios ({name, edges, points}).")
+    parser.add_argument('--move', action='append', default=[],
+                        help="Move one bound, e.g. attendance:70=72,75,80 or bands:100=90 (one scenario per value).")
+    parser.add_argument('--rules', default=RISK_RULES_PATH, help="Base rule file.")
+    parser.add_argument('--summary', default=SUMMARY_PATH, help="Where to write the band counts per scenario.")
+    parser.add_argument('--changes', default=CHANGES_PATH, help="Where to write the students who change band.")
+    args = parser.parse_args()
+
+    with open(args.rules) as f:
+        base_config = json.load(f)
+    try:
+        scenarios = load_scenarios(args.scenarios, base_config) if args.scenarios else []
+        for move in args.move:
+            scenarios += parse_move(move, base_config)
+        for _, config in scenarios:
+            ScoringPlan(config)  # rejects an invalid scenario before the features are loaded
+        features = load_features(rule.column for rule in ScoringPlan(base_config).rules)
+    except (ValueError, FileNotFoundError) as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+
+    start = time.perf_counter()
+    summary, changes = what_if(features, scenarios, base_config)
+    elapsed = time.perf_counter() - start
+    summary.to_csv(args.summary, index=False)
+    changes.to_csv(args.changes, index=False)
+    print(f"Scored {len(features):,} students under {len(scenarios) + 1} rule sets in {elapsed:.2f}s.\n")
+    print(summary.to_string(index=False))
+    print(f"\nBand counts written to '{args.summary}', {len(changes):,} band changes to '{args.changes}'.")